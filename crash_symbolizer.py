@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 import re
 import subprocess
 import tempfile
@@ -10,18 +11,533 @@ import plistlib
 from pathlib import Path
 import json
 from datetime import datetime
+from collections import OrderedDict, defaultdict
+import pty
+import select
+import mmap
+import bisect
+import sqlite3
+import functools
+import struct
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# lldb的Python模块随Xcode提供，不可用时退回到atos
+try:
+    import lldb
+except ImportError:
+    lldb = None
+
+# orjson可选，安装后用于加快MetricKit JSON的解析
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 常驻atos进程单次查询的超时时间(秒)
+ATOS_TIMEOUT = 30
+
+# atos未能解析时同时运行的lldb进程数上限，每个lldb进程都要加载完整的调试信息
+LLDB_MAX_PROCESSES = 2
+
+# 常驻atos进程启动时使用的加载地址，查询时地址会换算到该加载地址
+ATOS_DEFAULT_LOAD_ADDRESS = "0x100000000"
+
+# 进度信息累积到该数量后合并发送一次
+PROGRESS_BATCH_SIZE = 32
+
+# 内存中符号缓存的条目数上限
+SYMBOL_CACHE_MAX_ENTRIES = 100_000
+
+# 持久化缓存所在的目录
+SYMBOL_CACHE_DIR = Path.home() / ".cache" / "crashparser"
+
+# 系统库的帧无法用应用的dSYM符号化，直接使用原始符号
+SYSTEM_BINARIES = frozenset((
+    "UIKitCore", "UIKit", "Foundation", "CoreFoundation", "GraphicsServices", "QuartzCore",
+    "CoreGraphics", "WebKit", "JavaScriptCore", "SwiftUI", "CFNetwork", "Security",
+    "libobjc.A.dylib", "libdispatch.dylib", "libdyld.dylib", "dyld", "libswiftCore.dylib",
+    "libc++.1.dylib", "libc++abi.dylib",
+))
+SYSTEM_BINARY_PREFIXES = ("libsystem_", "libswift")
+
+# Crash文件解析使用的正则，在模块加载时编译一次
+# Crash内容以bytes(mmap)形式解析，只对匹配到的字段解码
+# 符号部分用贪婪匹配到行尾后只回退末尾的空白，避免非贪婪匹配在每个字符上尝试行尾
+_THREAD_HEADER_PATTERN = rb'Thread (?P<thread_id>\d+)(?P<crashed> Crashed)?:'
+_FRAME_PATTERN = rb'[ \t]*(?P<frame_index>\d+)[ \t]+(?P<binary_name>\S+)[ \t]+(?P<address>0x[0-9a-f]+)[ \t]+(?P<symbol>[^\r\n]*[^ \t\r\n])[ \t\r]*$'
+_EXCEPTION_HEADER_PATTERN = rb'(?P<exception_header>Last Exception Backtrace):'
+_BACKTRACE_RE = re.compile(rb'(?m)^(?:' + _THREAD_HEADER_PATTERN + rb'|' + _EXCEPTION_HEADER_PATTERN + rb'|' + _FRAME_PATTERN + rb'|[ \t\r]*$)')
+# 每个头部字段一个分支，命名分组即crash_info中的键，一次匹配同时拆分出字段的各部分
+_INFO_RE = re.compile(
+    rb'(?m)^(?:'
+    rb'Process:[ \t]+(?P<process_name>\S+)[ \t]+\[(?P<process_id>\d+)\]'
+    rb'|Version:[ \t]+(?P<version>.*?)[ \t]+\((?P<build>\S+)\)'
+    rb'|OS Version:[ \t]+(?P<os_version>.*?)[ \t]+\((?P<os_build>\S+)\)'
+    rb'|Exception Type:[ \t]+(?P<exception_type>.+?)'
+    rb'|Exception Codes:[ \t]+(?P<exception_codes>.+?)'
+    rb'|Triggered by Thread:[ \t]+(?P<triggered_thread>\d+)'
+    rb')[ \t\r]*$'
+)
+# 各头部字段所在分支的最后一个命名分组，用于判断哪些字段已经解析
+_INFO_LAST_GROUPS = frozenset(('process_id', 'build', 'os_build', 'exception_type', 'exception_codes', 'triggered_thread'))
+_IMAGE_RE = re.compile(rb'(?m)^[ \t]*(0x[0-9a-f]+)[ \t]+-[ \t]+(0x[0-9a-f]+)[ \t]+(\S+)[ \t]+(\S+)[ \t]+<([0-9a-f-]+)>')
+_BLANK_LINE_RE = re.compile(rb'(?m)^[ \t\r]*$')
+_BACKTRACE_SECTION_RE = re.compile(rb'(?m)^(?:Thread \d+|Last Exception Backtrace:|Application Specific Backtrace)')
+
+# dwarfdump --uuid 输出的解析正则
+_UUID_RE = re.compile(r'UUID: ([0-9A-F-]+)')
+_UUID_ARCH_RE = re.compile(r'UUID: ([0-9A-F-]+) \((\S+)\)')
+
+# Mach-O及fat文件头部的魔数
+FAT_MAGIC = 0xCAFEBABE
+FAT_MAGIC_64 = 0xCAFEBABF
+MH_MAGIC = 0xFEEDFACE
+MH_MAGIC_64 = 0xFEEDFACF
+MH_CIGAM = 0xCEFAEDFE
+MH_CIGAM_64 = 0xCFFAEDFE
+
+# Mach-O头部中的CPU类型 -> 架构名称，(CPU类型, 子类型)的组合优先匹配
+CPU_SUBTYPE_MASK = 0x00FFFFFF
+_CPU_TYPE_ARCHS = {
+    7: 'i386',
+    0x01000007: 'x86_64',
+    12: 'armv7',
+    0x0100000C: 'arm64',
+    0x0200000C: 'arm64_32',
+}
+_CPU_SUBTYPE_ARCHS = {
+    (0x01000007, 8): 'x86_64h',
+    (12, 11): 'armv7s',
+    (12, 12): 'armv7k',
+    (0x0100000C, 2): 'arm64e',
+}
+
+# lldb image lookup 输出中的符号，以及atos未能解析时原样返回的地址
+_SUMMARY_RE = re.compile(r'Summary: (.*)')
+_LLDB_LOOKUP_ECHO_RE = re.compile(r'(?m)^\(lldb\) image lookup --address (\S+)$')
+_HEXADDR_RE = re.compile(r'^0x[0-9a-f]+$')
+
+
+def _decode(data, encoding='utf-8'):
+    """将Crash内容中的bytes(或memoryview)解码为str，无法按指定编码解码时按latin-1解码"""
+    try:
+        return str(data, encoding)
+    except UnicodeDecodeError:
+        return str(data, 'latin-1')
+
+
+def _detect_encoding(head):
+    """
+    根据Crash内容的开头判断整个文件的编码
+    
+    Args:
+        head: Crash内容开头的一段bytes
+        
+    Returns:
+        str: 'utf-8'，开头已经不是合法的UTF-8时返回'latin-1'
+    """
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # 截取的末尾可能正好切断了一个多字节字符，这种情况仍然视为UTF-8
+        if e.start < len(head) - 3:
+            return 'latin-1'
+    return 'utf-8'
+
+
+def _read_plist_string(data, key):
+    """
+    从plist中直接读取顶层字典的一个字符串值，不解析整个plist
+    
+    Args:
+        data: plist文件的内容
+        key: 顶层字典中的键
+        
+    Returns:
+        str: 键对应的字符串，无法直接读取时返回None
+    """
+    try:
+        if not data.startswith(b"bplist00"):
+            match = re.search(rb'<key>' + re.escape(key.encode()) + rb'</key>\s*<string>([^<]*)</string>', data)
+            # 包含实体引用时交给plistlib处理
+            if not match or b'&' in match.group(1):
+                return None
+            return match.group(1).decode('utf-8')
+            
+        # 二进制plist: 末尾32字节为trailer，记录偏移表的位置和引用的字节数
+        offset_size, ref_size = data[-26], data[-25]
+        top_object = int.from_bytes(data[-16:-8], 'big')
+        offset_table = int.from_bytes(data[-8:], 'big')
+        
+        def object_offset(ref):
+            start = offset_table + ref * offset_size
+            return int.from_bytes(data[start:start + offset_size], 'big')
+            
+        def read_length(offset):
+            # 长度不超过14时直接保存在标记字节的低4位，否则后面跟一个整数对象
+            length = data[offset] & 0x0F
+            if length != 0x0F:
+                return length, offset + 1
+            size = 1 << (data[offset + 1] & 0x0F)
+            return int.from_bytes(data[offset + 2:offset + 2 + size], 'big'), offset + 2 + size
+            
+        def read_string(ref):
+            offset = object_offset(ref)
+            marker = data[offset] & 0xF0
+            length, start = read_length(offset)
+            if marker == 0x50:
+                return data[start:start + length].decode('ascii')
+            if marker == 0x60:
+                return data[start:start + length * 2].decode('utf-16-be')
+            return None
+            
+        offset = object_offset(top_object)
+        if data[offset] & 0xF0 != 0xD0:
+            return None
+        count, refs = read_length(offset)
+        for i in range(count):
+            key_ref = int.from_bytes(data[refs + i * ref_size:refs + (i + 1) * ref_size], 'big')
+            if read_string(key_ref) == key:
+                value_start = refs + (count + i) * ref_size
+                return read_string(int.from_bytes(data[value_start:value_start + ref_size], 'big'))
+        return None
+    except (IndexError, UnicodeDecodeError):
+        return None
+
+
+def _is_symbolized(symbol):
+    """
+    判断atos或lldb的输出是否为解析出的符号
+    
+    无法解析时输出的是??或原始地址(可能附带镜像名，如 0x1234 (in MyApp))，
+    解析出的符号以函数名开头，其中出现的偏移或地址不影响判断。
+    
+    Args:
+        symbol: atos或lldb的输出
+        
+    Returns:
+        bool: 是否解析成功
+    """
+    return bool(symbol) and symbol != "??" and not symbol.startswith("0x")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_hex(value):
+    """解析十六进制字符串，MetricKit中重复出现的地址和偏移只解析一次"""
+    return int(value, 16)
+
+
+def _hex_to_int(value):
+    """将MetricKit中的地址或偏移(十六进制字符串或整数)转换为整数"""
+    if isinstance(value, str):
+        return _parse_hex(value)
+    return value or 0
+
+
+@functools.lru_cache(maxsize=16)
+def _load_json_cached(path, mtime, size):
+    """
+    读取并解析JSON文件，同一文件未修改时直接返回上次的解析结果
+    
+    返回的对象在多次调用之间共享，调用方不应修改。
+    
+    Args:
+        path: JSON文件路径
+        mtime: 文件的修改时间，作为缓存键的一部分
+        size: 文件大小，作为缓存键的一部分
+        
+    Returns:
+        解析后的JSON数据
+    """
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dwarf_file(path):
+    """
+    获取dSYM包中实际保存DWARF信息的文件
+    
+    原地重新生成dSYM时只有Contents/Resources/DWARF下的文件会改变，dSYM目录本身的修改时间不变。
+    
+    Args:
+        path: dSYM包或二进制文件的路径
+        
+    Returns:
+        str: DWARF文件的路径，path不是dSYM包时原样返回
+    """
+    try:
+        with os.scandir(os.path.join(path, "Contents", "Resources", "DWARF")) as it:
+            entry = next((e for e in it if e.is_file()), None)
+    except (FileNotFoundError, NotADirectoryError):
+        return path
+    return entry.path if entry is not None else path
+
+
+def _file_signature(path):
+    """
+    文件内容的签名，dSYM包使用其中的DWARF文件
+    
+    Args:
+        path: dSYM包或二进制文件的路径
+        
+    Returns:
+        tuple: (修改时间(纳秒), 文件大小)
+    """
+    st = os.stat(_dwarf_file(path))
+    return (st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _dwarfdump_uuid(path, signature):
+    """
+    获取 dwarfdump --uuid 的输出，文件未修改时直接返回上次的结果
+    
+    Args:
+        path: 二进制文件或dSYM文件的路径
+        signature: _file_signature返回的文件签名，作为缓存键的一部分
+        
+    Returns:
+        str: dwarfdump的输出
+    """
+    # 输出只包含UUID、架构和路径，按字节读取后直接解码，不经过按locale解码的文本包装
+    return subprocess.run(
+        ["dwarfdump", "--uuid", path],
+        capture_output=True,
+        check=True
+    ).stdout.decode('utf-8', 'replace')
+
+
+def _macho_archs(path):
+    """
+    直接读取Mach-O文件头部获取包含的架构，无需启动lipo
+    
+    支持fat(含64位fat)文件以及大小端的32/64位单架构文件。
+    
+    Args:
+        path: 二进制文件的路径
+        
+    Returns:
+        tuple: 架构名称，文件格式或CPU类型无法识别时返回None
+    """
+    with open(path, 'rb') as f:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        magic = int.from_bytes(header[:4], 'big')
+        if magic in (FAT_MAGIC, FAT_MAGIC_64):
+            count = int.from_bytes(header[4:8], 'big')
+            entry_size = 20 if magic == FAT_MAGIC else 32
+            data = f.read(count * entry_size)
+            if count > 64 or len(data) < count * entry_size:
+                return None
+            cpus = [struct.unpack_from('>II', data, i * entry_size) for i in range(count)]
+        elif magic in (MH_MAGIC, MH_MAGIC_64):
+            cpus = [struct.unpack('>II', header[4:8] + f.read(4))]
+        elif magic in (MH_CIGAM, MH_CIGAM_64):
+            cpus = [struct.unpack('<II', header[4:8] + f.read(4))]
+        else:
+            return None
+            
+    archs = []
+    for cputype, cpusubtype in cpus:
+        arch = _CPU_SUBTYPE_ARCHS.get((cputype, cpusubtype & CPU_SUBTYPE_MASK)) or _CPU_TYPE_ARCHS.get(cputype)
+        if arch is None:
+            return None
+        archs.append(arch)
+    return tuple(archs)
+
+
+@functools.lru_cache(maxsize=128)
+def _binary_archs(path, mtime):
+    """
+    获取二进制文件包含的架构，文件未修改时直接返回上次的结果
+    
+    优先直接解析Mach-O头部，无法识别时再使用 lipo -archs。
+    
+    Args:
+        path: 二进制文件的路径
+        mtime: 文件的修改时间，作为缓存键的一部分
+        
+    Returns:
+        tuple: 架构名称
+    """
+    try:
+        archs = _macho_archs(path)
+    except OSError:
+        archs = None
+    if archs:
+        return archs
+        
+    # lipo -archs 直接输出以空格分隔的架构列表，无需区分fat/non-fat的文字描述
+    return tuple(subprocess.run(
+        ["lipo", "-archs", path],
+        capture_output=True,
+        check=True
+    ).stdout.decode('ascii', 'replace').split())
+
+
+def _lldb_batch_lookup(arch, binary_path, dsym_path, base_address, addresses):
+    """
+    启动一个lldb进程，按镜像的加载地址载入二进制文件后批量查询同一镜像内的地址
+    
+    lldb启动和加载DWARF信息都很慢，同一镜像的所有地址只使用一个进程。
+    
+    Args:
+        arch: 架构名称
+        binary_path: 二进制文件的路径
+        dsym_path: dSYM文件的路径，可以为None
+        base_address: 镜像的十六进制加载地址
+        addresses: 需要符号化的地址列表
+        
+    Returns:
+        list: 与addresses一一对应的lldb Summary，没有Summary的地址为None
+    """
+    commands = ["-o", f'target create --arch {arch} "{binary_path}"']
+    if dsym_path:
+        commands += ["-o", f'target symbols add "{dsym_path}"']
+    commands += ["-o", f'target modules load --file "{os.path.basename(binary_path)}" __TEXT {base_address}']
+    for address in addresses:
+        commands += ["-o", f"image lookup --address {address}"]
+        
+    lldb_result = subprocess.run(
+        ["lldb", "--batch", *commands],
+        capture_output=True,
+        timeout=ATOS_TIMEOUT + len(addresses)
+    )
+    # 批量模式下每条命令的输出之前都有回显的命令，按回显拆分出各地址的输出
+    parts = _LLDB_LOOKUP_ECHO_RE.split(lldb_result.stdout.decode('utf-8', 'replace'))
+    summaries = {}
+    for address, output in zip(parts[1::2], parts[2::2]):
+        match = _SUMMARY_RE.search(output)
+        if match:
+            summaries[address] = match.group(1)
+    return [summaries.get(address) for address in addresses]
+
+
+class _SymbolCache(OrderedDict):
+    """
+    有条目数上限的符号缓存，超过上限时淘汰最久未使用的条目
+    
+    单个Crash文件的地址数远小于上限，同一次符号化中解析出的符号不会被淘汰；
+    多次运行之间的符号由SQLite持久化缓存保留。
+    """
+    
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+        
+    def _evict(self):
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+            
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+        
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+        
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        self._evict()
+        
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+        
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+class _AtosProcess:
+    """常驻的atos进程，通过标准输入逐行查询地址"""
+
+    def __init__(self, arch, object_path, load_address):
+        self.load_address = int(load_address, 16)
+        self._buffer = b""
+
+        # atos的标准输出连接到管道时是块缓冲的，使用伪终端使其逐行输出
+        master_fd, slave_fd = pty.openpty()
+        try:
+            self.proc = subprocess.Popen(
+                ["atos", "-arch", arch, "-o", object_path, "-l", load_address],
+                stdin=subprocess.PIPE,
+                stdout=slave_fd,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1
+            )
+        except Exception:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+        self._fd = master_fd
+
+    @classmethod
+    def start(cls, arch, object_path):
+        """启动atos进程并完成一次查询，确保dSYM已经加载"""
+        atos = cls(arch, object_path, ATOS_DEFAULT_LOAD_ADDRESS)
+        try:
+            atos.lookup(ATOS_DEFAULT_LOAD_ADDRESS)
+        except Exception:
+            atos.close()
+            raise
+        return atos
+
+    def lookup(self, address, timeout=ATOS_TIMEOUT):
+        """写入一个地址并读取对应的一行符号化结果"""
+        self.proc.stdin.write(address + "\n")
+        self.proc.stdin.flush()
+
+        while b"\n" not in self._buffer:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+            if not ready:
+                raise TimeoutError(f"atos响应超时: {address}")
+            chunk = os.read(self._fd, 4096)
+            if not chunk:
+                raise EOFError("atos进程已退出")
+            self._buffer += chunk
+
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line.rstrip(b"\r").decode("utf-8", "replace").strip()
+
+    def close(self):
+        """结束atos进程"""
+        if self._fd is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        os.close(self._fd)
+        self._fd = None
 
 
 class CrashSymbolizer:
     """iOS Crash堆栈符号化解析器"""
     
-    def __init__(self):
+    def __init__(self, verbose=True):
+        self.verbose = verbose  # 是否在控制台输出MetricKit符号化的详细日志
         self.dsym_path = None
         self.binary_path = None
         self.binary_name = None
         self.binary_uuid = None
         self.crash_content = None
-        self.crash_lines = []
         self.binary_images = []
         self.thread_backtraces = []
         self.crash_info = {}
@@ -31,72 +547,118 @@ class CrashSymbolizer:
         self.crash_reason = None
         self.device_info = {}
         self.process_info = {}
-        self.symbol_cache = {}  # 添加符号缓存
+        self.symbol_cache = _SymbolCache(SYMBOL_CACHE_MAX_ENTRIES)  # 添加符号缓存，条目数有上限
+        self._unresolved = set()  # atos和lldb都明确无法解析的地址的缓存键，键中包含镜像UUID，不再重复查询
+        self._lldb_failed_dsyms = set()  # lldb一个地址都无法解析的dSYM的UUID，不再使用lldb查询
+        self.crashed_only = False  # 为True时只符号化崩溃线程的堆栈帧，其他线程保留原始符号
+        self.avoid_libraries = set()  # 用户指定的不需要符号化的镜像名称，与SYSTEM_BINARIES一起生效
+        self._atos_pool = {}  # (arch, object_path) -> 常驻atos进程的Future
+        self._atos_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="atos")
+        self._lldb_debugger = None  # 进程内DWARF查询使用的lldb调试器
+        self._lldb_targets = {}  # (二进制文件路径, dSYM路径, 架构) -> (lldb目标, 模块)
+        self._progress_buf = []  # 待发送的进度信息
+        self._symbol_db_conn = None  # 持久化符号缓存的数据库连接
+        self._symbol_db_disabled = False  # 数据库无法打开时不再重试
+        self._uuid_to_arch = {}  # dSYM中各架构切片的UUID -> 架构
+        self.dsym_arch = None  # dSYM只包含一个架构时的架构名称
+        self._image_name_to_idx = {}  # 镜像名称 -> binary_images下标
+        self._image_order = []  # 按加载地址排序的binary_images下标
+        self._image_loads = []  # 排序后的加载地址
+        self._image_ends = []  # 排序后的结束地址
+        self._backtraces_offset = 0  # 第一个回溯部分在Crash内容中的偏移
+        self._frames = []  # 所有堆栈帧，包含其在Crash内容中的位置
+        self._images_offset = 0  # Binary Images部分在Crash内容中的偏移
+        self._encoding = 'utf-8'  # Crash内容的编码
+        self._metrickit_images = {}  # MetricKit中的镜像名称 -> 二进制镜像
+        self.metrickit_json_size = None  # 最近加载的MetricKit JSON文件的大小(字节)
+        self._binary_index = {}  # MetricKit中的(镜像名称, UUID) -> binary_images下标
+        self._loaded_archive_key = None  # 最近成功加载的(Archive路径, 二进制文件签名, DWARF文件签名)
         
-    def load_archive(self, archive_path):
+    def load_archive(self, archive_path, use_lldb=True):
         """
         从.xcarchive文件中加载dSYM文件和二进制文件
         
         Args:
             archive_path: .xcarchive文件的路径
+            use_lldb: 之后的符号化是否优先使用lldb，为True且lldb模块可用时不预先启动atos进程
+            
+        同一个Archive中的二进制文件和dSYM都未修改时不会重复加载。
         """
         if not os.path.exists(archive_path):
             raise FileNotFoundError(f"Archive文件不存在: {archive_path}")
             
-        # 查找应用包
+        archive_abspath = os.path.abspath(archive_path)
+        if self._loaded_archive_key is not None and self._loaded_archive_key == self._archive_key(archive_abspath):
+            return
+        self._loaded_archive_key = None
+        # 重新加载时之前的atos进程和lldb目标不再可用，即使路径相同文件也可能已经重新生成
+        self._release_archive_tools()
+        # 无法解析的地址和lldb的可用情况是按之前的dSYM得到的
+        self._unresolved.clear()
+        self._lldb_failed_dsyms.clear()
+        
+        # 每个目录只用scandir扫描一次，后续直接使用扫描结果，避免逐个exists的stat调用
         products_path = os.path.join(archive_path, "Products", "Applications")
-        if not os.path.exists(products_path):
+        try:
+            with os.scandir(products_path) as it:
+                app_entry = next((e for e in it if e.name.endswith('.app')), None)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Applications目录不存在: {products_path}")
             
         # 查找.app文件
-        app_files = [f for f in os.listdir(products_path) if f.endswith('.app')]
-        if not app_files:
+        if app_entry is None:
             raise FileNotFoundError("找不到.app文件")
             
-        app_path = os.path.join(products_path, app_files[0])
+        app_path = app_entry.path
+        with os.scandir(app_path) as it:
+            app_entries = {e.name: e for e in it}
         
         # 获取应用包中的Info.plist文件
-        info_plist_path = os.path.join(app_path, "Info.plist")
-        if not os.path.exists(info_plist_path):
-            raise FileNotFoundError(f"Info.plist文件不存在: {info_plist_path}")
+        info_plist_entry = app_entries.get("Info.plist")
+        if info_plist_entry is None:
+            raise FileNotFoundError(f"Info.plist文件不存在: {os.path.join(app_path, 'Info.plist')}")
             
         # 解析Info.plist获取应用名称
         try:
-            with open(info_plist_path, 'rb') as fp:
-                info_plist = plistlib.load(fp)
-                app_name = info_plist.get("CFBundleExecutable")
-                if not app_name:
-                    raise ValueError("无法从Info.plist获取应用名称(CFBundleExecutable)")
-                    
-                self.binary_name = app_name
+            # 一次性读入后只查找需要的键，找不到时再完整解析
+            info_plist_data = Path(info_plist_entry.path).read_bytes()
+            app_name = _read_plist_string(info_plist_data, "CFBundleExecutable")
+            if app_name is None:
+                app_name = plistlib.loads(info_plist_data).get("CFBundleExecutable")
+            if not app_name:
+                raise ValueError("无法从Info.plist获取应用名称(CFBundleExecutable)")
                 
-                # 查找应用的二进制文件
-                binary_path = os.path.join(app_path, app_name)
-                if not os.path.exists(binary_path):
-                    raise FileNotFoundError(f"找不到应用的二进制文件: {binary_path}")
-                    
-                self.binary_path = binary_path
+            self.binary_name = app_name
+            
+            # 查找应用的二进制文件
+            binary_entry = app_entries.get(app_name)
+            if binary_entry is None:
+                raise FileNotFoundError(f"找不到应用的二进制文件: {os.path.join(app_path, app_name)}")
                 
+            self.binary_path = binary_entry.path
+            
+        except OSError as e:
+            raise OSError(f"解析Info.plist失败: {str(e)}") from e
         except Exception as e:
-            raise Exception(f"解析Info.plist失败: {str(e)}")
+            raise ValueError(f"解析Info.plist失败: {str(e)}") from e
             
         # 查找dSYM文件
         dsyms_path = os.path.join(archive_path, "dSYMs")
-        if not os.path.exists(dsyms_path):
+        try:
+            with os.scandir(dsyms_path) as it:
+                dsym_entries = list(it)
+        except FileNotFoundError:
             raise FileNotFoundError(f"dSYMs目录不存在: {dsyms_path}")
             
-        # 查找应用的dSYM文件
+        # 查找应用的dSYM文件，优先使用同名的dSYM，否则使用第一个名称包含应用名的dSYM
         app_dsym = None
         dsym_name = f"{app_name}.app.dSYM"
-        dsym_path = os.path.join(dsyms_path, dsym_name)
-        if os.path.exists(dsym_path):
-            app_dsym = dsym_path
-        else:
-            # 尝试查找其他匹配的dSYM文件
-            for dsym in os.listdir(dsyms_path):
-                if dsym.endswith(".dSYM") and app_name in dsym:
-                    app_dsym = os.path.join(dsyms_path, dsym)
-                    break
+        for entry in dsym_entries:
+            if entry.name == dsym_name:
+                app_dsym = entry.path
+                break
+            if app_dsym is None and entry.name.endswith(".dSYM") and app_name in entry.name:
+                app_dsym = entry.path
                     
         if not app_dsym:
             raise FileNotFoundError(f"找不到应用的dSYM文件: {dsym_name}")
@@ -105,45 +667,60 @@ class CrashSymbolizer:
         
         # 获取二进制文件的UUID
         try:
-            result = subprocess.run(
-                ["dwarfdump", "--uuid", self.dsym_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            dsym_output = _dwarfdump_uuid(self.dsym_path, _file_signature(self.dsym_path))
             
             # 解析UUID
-            uuid_match = re.search(r'UUID: ([0-9A-F-]+)', result.stdout)
+            uuid_match = _UUID_RE.search(dsym_output)
             if uuid_match:
                 self.binary_uuid = uuid_match.group(1).lower()
             else:
                 raise ValueError("无法获取二进制文件的UUID")
                 
+            # 记录每个架构切片的UUID，符号化时可以直接确定架构
+            self._uuid_to_arch = {
+                uuid.replace('-', '').lower(): arch
+                for uuid, arch in _UUID_ARCH_RE.findall(dsym_output)
+            }
+            dsym_archs = set(self._uuid_to_arch.values())
+            self.dsym_arch = dsym_archs.pop() if len(dsym_archs) == 1 else None
+                
         except subprocess.CalledProcessError as e:
             raise Exception(f"获取UUID失败: {str(e)}")
             
         # 在加载完成后验证 UUID
         self.verify_dsym_uuid()
         
-        # 预热符号缓存
-        print("正在预热符号缓存...")
-        self._warm_up_symbol_cache()
+        # 在后台提前启动dSYM各架构的atos进程；使用lldb时在进程内查询，atos进程按需再启动
+        if not (use_lldb and lldb is not None):
+            for arch in set(self._uuid_to_arch.values()):
+                self._start_atos(arch, self.dsym_path)
+            
+        self._loaded_archive_key = self._archive_key(archive_abspath)
         
+    def _archive_key(self, archive_path):
+        """
+        已加载的Archive的缓存键，二进制文件或dSYM被重新生成、替换后随之变化
+        
+        Args:
+            archive_path: .xcarchive文件的绝对路径
+            
+        Returns:
+            tuple: (Archive路径, 二进制文件签名, dSYM中DWARF文件的签名)，文件不存在时返回None
+        """
+        try:
+            return (archive_path, _file_signature(self.binary_path), _file_signature(self.dsym_path))
+        except (OSError, TypeError):
+            return None
+            
     def verify_dsym_uuid(self):
         """验证 dSYM 文件的 UUID 是否与应用匹配"""
         if not self.binary_path or not self.dsym_path:
             raise ValueError("二进制文件或dSYM文件路径未设置")
         
-        # 获取二进制文件的 UUID
-        binary_uuid_cmd = ["dwarfdump", "--uuid", self.binary_path]
-        dsym_uuid_cmd = ["dwarfdump", "--uuid", self.dsym_path]
-        
+        # 获取二进制文件的 UUID，dwarfdump的结果按文件缓存，load_archive中已获取的不会重复执行
         try:
-            binary_result = subprocess.run(binary_uuid_cmd, capture_output=True, text=True, check=True)
-            dsym_result = subprocess.run(dsym_uuid_cmd, capture_output=True, text=True, check=True)
-            
-            binary_uuid = re.search(r'UUID: ([0-9A-F-]+)', binary_result.stdout)
-            dsym_uuid = re.search(r'UUID: ([0-9A-F-]+)', dsym_result.stdout)
+            binary_uuid = _UUID_RE.search(_dwarfdump_uuid(self.binary_path, _file_signature(self.binary_path)))
+            dsym_uuid = _UUID_RE.search(_dwarfdump_uuid(self.dsym_path, _file_signature(self.dsym_path)))
             
             if not binary_uuid or not dsym_uuid:
                 raise ValueError("无法获取UUID")
@@ -160,56 +737,31 @@ class CrashSymbolizer:
         except subprocess.CalledProcessError as e:
             raise Exception(f"验证UUID失败: {str(e)}")
 
-    def _warm_up_symbol_cache(self):
-        """预热符号缓存，提前加载常用符号"""
-        if not self.binary_path or not self.dsym_path:
-            return
-        
-        try:
-            # 使用 nm 命令获取所有符号
-            nm_cmd = ["nm", "-arch", "arm64", self.binary_path]
-            result = subprocess.run(nm_cmd, capture_output=True, text=True)
-            
-            # 解析并缓存关键符号
-            for line in result.stdout.splitlines():
-                if " t " in line or " T " in line:  # 只缓存文本段的符号
-                    parts = line.split(" ")
-                    if len(parts) >= 3:
-                        address = parts[0]
-                        symbol = parts[-1]
-                        cache_key = f"{address}_arm64_0x0"
-                        self.symbol_cache[cache_key] = symbol
-                        
-        except Exception as e:
-            print(f"预热符号缓存时出错: {str(e)}")
-
     def load_crash_file(self, crash_path):
         """
         加载Crash文件
         
+        文件通过mmap只读映射，不会整体读入内存，解析时按需解码。
+        
         Args:
             crash_path: Crash文件的路径
             
         Returns:
-            str: Crash文件的内容
+            mmap.mmap: Crash文件的内容
         """
         if not os.path.exists(crash_path):
             raise FileNotFoundError(f"Crash文件不存在: {crash_path}")
             
         try:
-            with open(crash_path, 'r', encoding='utf-8') as f:
-                self.crash_content = f.read()
+            with open(crash_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # 空文件无法映射
+                    self.crash_content = b""
+                else:
+                    self.crash_content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
                 return self.crash_content
-        except UnicodeDecodeError:
-            # 尝试其他编码
-            try:
-                with open(crash_path, 'r', encoding='latin-1') as f:
-                    self.crash_content = f.read()
-                    return self.crash_content
-            except Exception as e:
-                raise Exception(f"读取Crash文件失败: {str(e)}")
-        except Exception as e:
-            raise Exception(f"读取Crash文件失败: {str(e)}")
+        except OSError as e:
+            raise OSError(f"读取Crash文件失败: {str(e)}") from e
             
     def parse_crash(self, crash_content):
         """
@@ -221,306 +773,739 @@ class CrashSymbolizer:
         if not crash_content:
             raise ValueError("Crash内容为空")
             
-        self.crash_lines = crash_content.splitlines()
+        if isinstance(crash_content, str):
+            crash_content = crash_content.encode('utf-8')
+            
+        self.crash_content = crash_content
+        # 只根据开头判断一次编码，非UTF-8的文件不必在每个字段上先尝试UTF-8再回退
+        self._encoding = _detect_encoding(crash_content[:4096])
+        self.crash_info = {}
+        self.binary_images = []
+        self.thread_backtraces = []
+        self._frames = []
+        
+        # 定位各部分的位置，后续的正则只扫描对应的区间
+        self._locate_sections()
         
         # 解析Crash基本信息
         self._parse_crash_info()
         
         # 解析二进制镜像信息
         self._parse_binary_images()
+        self._build_image_index()
         
         # 解析线程回溯信息
         self._parse_thread_backtraces()
         
+    def _locate_sections(self):
+        """定位回溯部分和二进制镜像部分在Crash内容中的偏移"""
+        content = self.crash_content
+        
+        images_offset = content.find(b"Binary Images:")
+        self._images_offset = images_offset if images_offset != -1 else len(content)
+        
+        # 第一个回溯部分(线程回溯或Last Exception Backtrace等)的开始位置
+        section = _BACKTRACE_SECTION_RE.search(content, 0, self._images_offset)
+        self._backtraces_offset = section.start() if section else self._images_offset
+            
     def _parse_crash_info(self):
-        """解析Crash基本信息"""
-        for line in self.crash_lines:
-            # 解析进程名称
-            if "Process:" in line:
-                match = re.search(r'Process:\s+(\S+)\s+\[(\d+)\]', line)
-                if match:
-                    self.crash_info['process_name'] = match.group(1)
-                    self.crash_info['process_id'] = match.group(2)
-                    
-            # 解析版本信息
-            elif "Version:" in line:
-                match = re.search(r'Version:\s+(.*?)\s+\((\S+)\)', line)
-                if match:
-                    self.crash_info['version'] = match.group(1)
-                    self.crash_info['build'] = match.group(2)
-                    
-            # 解析OS版本
-            elif "OS Version:" in line:
-                match = re.search(r'OS Version:\s+(.*?)\s+\((\S+)\)', line)
-                if match:
-                    self.crash_info['os_version'] = match.group(1)
-                    self.crash_info['os_build'] = match.group(2)
-                    
-            # 解析异常类型
-            elif "Exception Type:" in line:
-                match = re.search(r'Exception Type:\s+(.*)', line)
-                if match:
-                    self.crash_info['exception_type'] = match.group(1)
-                    
-            # 解析异常代码
-            elif "Exception Codes:" in line:
-                match = re.search(r'Exception Codes:\s+(.*)', line)
-                if match:
-                    self.crash_info['exception_codes'] = match.group(1)
-                    
-            # 解析触发线程
-            elif "Triggered by Thread:" in line:
-                match = re.search(r'Triggered by Thread:\s+(\d+)', line)
-                if match:
-                    self.crash_info['triggered_thread'] = int(match.group(1))
+        """
+        解析Crash基本信息
+        
+        这些字段只出现在回溯部分之前的头部，且每个只出现一次：只在头部范围内查找，
+        由匹配到的命名分组确定字段，所有字段都找到后立即结束。
+        """
+        pending = set(_INFO_LAST_GROUPS)
+        for match in _INFO_RE.finditer(self.crash_content, 0, self._backtraces_offset):
+            if match.lastgroup not in pending:
+                continue
+            pending.discard(match.lastgroup)
+            
+            for key, value in match.groupdict().items():
+                if value is not None:
+                    self.crash_info[key] = _decode(value, self._encoding)
                     
+            if not pending:
+                break
+                
+        if 'triggered_thread' in self.crash_info:
+            self.crash_info['triggered_thread'] = int(self.crash_info['triggered_thread'])
+            
     def _parse_binary_images(self):
         """解析二进制镜像信息"""
-        binary_section_start = False
+        header = self._images_offset
+        if header == len(self.crash_content):
+            return
+            
+        # 二进制镜像部分从标题的下一行开始，到第一个空行结束
+        start = self.crash_content.find(b"\n", header)
+        if start == -1:
+            return
+        start += 1
+        blank_line = _BLANK_LINE_RE.search(self.crash_content, start)
+        end = blank_line.start() if blank_line else len(self.crash_content)
+        
+        for match in _IMAGE_RE.finditer(self.crash_content, start, end):
+            image = {
+                'load_address': match.group(1).decode('ascii'),
+                'end_address': match.group(2).decode('ascii'),
+                'name': _decode(match.group(3), self._encoding),
+                'version': _decode(match.group(4), self._encoding),
+                'uuid': match.group(5).decode('ascii')
+            }
+            self.binary_images.append(image)
+            
+    def _build_image_index(self):
+        """建立二进制镜像的名称索引和按加载地址排序的地址索引"""
+        self._image_name_to_idx = {}
+        for index, image in enumerate(self.binary_images):
+            self._image_name_to_idx.setdefault(image['name'], index)
+            
+        load_addresses = [int(image['load_address'], 16) for image in self.binary_images]
+        self._image_order = sorted(range(len(self.binary_images)), key=load_addresses.__getitem__)
+        self._image_loads = [load_addresses[index] for index in self._image_order]
+        self._image_ends = [int(self.binary_images[index]['end_address'], 16) for index in self._image_order]
+        
+    def find_image(self, address):
+        """
+        根据地址查找所属的二进制镜像
+        
+        Args:
+            address: 十六进制地址字符串
+            
+        Returns:
+            int: 镜像在binary_images中的下标，找不到时返回None
+        """
+        pc = int(address, 16)
+        pos = bisect.bisect_right(self._image_loads, pc) - 1
+        if pos >= 0 and pc <= self._image_ends[pos]:
+            return self._image_order[pos]
+        return None
+        
+    def _is_app_frame(self, binary_name, address, app_index):
+        """判断堆栈帧是否属于应用镜像，名称被截断时按地址范围判断"""
+        if binary_name == self.binary_name or self.binary_name in binary_name:
+            return True
+        return self.find_image(address) == app_index
         
-        for line in self.crash_lines:
-            if "Binary Images:" in line:
-                binary_section_start = True
-                continue
-                
-            if binary_section_start:
-                # 匹配二进制镜像行
-                match = re.search(r'(0x[0-9a-f]+)\s+-\s+(0x[0-9a-f]+)\s+(\S+)\s+(\S+)\s+<([0-9a-f-]+)>', line)
-                if match:
-                    image = {
-                        'load_address': match.group(1),
-                        'end_address': match.group(2),
-                        'name': match.group(3),
-                        'version': match.group(4),
-                        'uuid': match.group(5)
-                    }
-                    self.binary_images.append(image)
-                elif line.strip() == "":
-                    # 空行表示二进制镜像部分结束
-                    break
-                    
     def _parse_thread_backtraces(self):
-        """解析线程回溯信息"""
+        """
+        解析线程回溯信息
+        
+        所有堆栈帧(包括不属于线程的Last Exception Backtrace)连同其符号部分在Crash内容中的
+        位置一起记录到self._frames，符号化时直接使用，不再重新扫描Crash内容。
+        崩溃线程和Last Exception Backtrace中的帧标记为crashed。
+        """
         current_thread = None
+        crashed = False
         
-        for line in self.crash_lines:
+        for match in _BACKTRACE_RE.finditer(self.crash_content, self._backtraces_offset, self._images_offset):
             # 匹配线程开始
-            thread_match = re.search(r'^Thread (\d+)( Crashed)?:', line)
-            if thread_match:
-                thread_id = int(thread_match.group(1))
-                is_crashed = bool(thread_match.group(2))
-                
+            if match.group('thread_id') is not None:
                 current_thread = {
-                    'id': thread_id,
-                    'is_crashed': is_crashed,
+                    'id': int(match.group('thread_id')),
+                    'is_crashed': bool(match.group('crashed')),
                     'frames': []
                 }
-                
                 self.thread_backtraces.append(current_thread)
-                continue
+                crashed = current_thread['is_crashed']
+                
+            # 匹配Last Exception Backtrace开始，其中的帧不属于任何线程
+            elif match.group('exception_header') is not None:
+                current_thread = None
+                crashed = True
                 
             # 匹配堆栈帧
-            if current_thread:
-                frame_match = re.search(r'^\d+\s+(\S+)\s+(0x[0-9a-f]+)\s+(.+)$', line.strip())
-                if frame_match:
-                    frame = {
-                        'binary_name': frame_match.group(1),
-                        'address': frame_match.group(2),
-                        'symbol': frame_match.group(3)
-                    }
+            elif match.group('address') is not None:
+                frame = {
+                    'index': match.group('frame_index').decode('ascii'),
+                    'binary_name': _decode(match.group('binary_name'), self._encoding),
+                    'address': match.group('address').decode('ascii'),
+                    'symbol': _decode(match.group('symbol'), self._encoding),
+                    'span': match.span('symbol'),
+                    'crashed': crashed
+                }
+                self._frames.append(frame)
+                if current_thread:
                     current_thread['frames'].append(frame)
-                elif line.strip() == "":
-                    current_thread = None
                     
-    def symbolize(self, progress_signal=None):
+            # 空行表示线程回溯结束
+            else:
+                current_thread = None
+                crashed = False
+                
+    def symbolize(self, progress_signal=None, use_lldb=True):
         """
         符号化堆栈信息
         
         Args:
             progress_signal: 用于发送进度信息的信号
+            use_lldb: lldb模块可用时是否优先在进程内直接查询dSYM
             
         Returns:
             str: 符号化后的Crash内容
         """
-        if not self.crash_lines:
+        return "".join(self.symbolize_iter(progress_signal, use_lldb))
+        
+    def symbolize_to_file(self, output_path, progress_signal=None, use_lldb=True):
+        """
+        符号化堆栈信息并直接写入文件，输出内容不在内存中整体拼接
+        
+        Args:
+            output_path: 输出文件的路径
+            progress_signal: 用于发送进度信息的信号
+            use_lldb: lldb模块可用时是否优先在进程内直接查询dSYM
+        """
+        try:
+            with open(output_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+                for segment in self.symbolize_iter(progress_signal, use_lldb):
+                    f.write(segment)
+        except OSError as e:
+            raise OSError(f"写入符号化结果失败: {str(e)}") from e
+            
+    def symbolize_iter(self, progress_signal=None, use_lldb=True):
+        """
+        符号化堆栈信息，按顺序逐段生成符号化后的内容
+        
+        所有地址在生成第一段内容之前解析完成，之后按Crash内容的顺序生成各段文本，
+        调用方可以边生成边写出，不必保留完整的结果。
+        
+        Args:
+            progress_signal: 用于发送进度信息的信号
+            use_lldb: lldb模块可用时是否优先在进程内直接查询dSYM
+            
+        Yields:
+            str: 符号化后的Crash内容片段
+        """
+        if not self.crash_content:
             raise ValueError("没有Crash内容可供符号化")
             
-        if progress_signal:
-            progress_signal.emit("\n" + "="*50)
-            progress_signal.emit("开始符号化过程")
-            progress_signal.emit("="*50)
+        self._progress(progress_signal, "\n" + "="*50)
+        self._progress(progress_signal, "开始符号化过程")
+        self._progress(progress_signal, "="*50)
         
         # 获取应用的加载地址和结束地址
         app_load_address = None
         app_end_address = None
         app_image = None
         
-        if progress_signal:
-            progress_signal.emit("\n[1] 查找应用二进制镜像信息...")
-            
-        for image in self.binary_images:
-            if self.binary_name in image['name']:
-                app_load_address = image['load_address']
-                app_end_address = image['end_address']
-                app_image = image
-                if progress_signal:
-                    progress_signal.emit("✓ 找到应用镜像:")
-                    progress_signal.emit(f"  - 名称: {image['name']}")
-                    progress_signal.emit(f"  - UUID: {image['uuid']}")
-                    progress_signal.emit(f"  - 版本: {image['version']}")
-                    progress_signal.emit(f"  - 加载地址: {app_load_address}")
-                    progress_signal.emit(f"  - 结束地址: {app_end_address}")
-                break
+        self._progress(progress_signal, "\n[1] 查找应用二进制镜像信息...")
+            
+        # 优先按名称精确查找，找不到时再按名称包含关系查找
+        app_index = self._image_name_to_idx.get(self.binary_name)
+        if app_index is None:
+            app_index = next(
+                (i for i, image in enumerate(self.binary_images) if self.binary_name in image['name']),
+                None
+            )
+            
+        if app_index is not None:
+            app_image = self.binary_images[app_index]
+            app_load_address = app_image['load_address']
+            app_end_address = app_image['end_address']
+            self._progress(progress_signal, "✓ 找到应用镜像:")
+            self._progress(progress_signal, f"  - 名称: {app_image['name']}")
+            self._progress(progress_signal, f"  - UUID: {app_image['uuid']}")
+            self._progress(progress_signal, f"  - 版本: {app_image['version']}")
+            self._progress(progress_signal, f"  - 加载地址: {app_load_address}")
+            self._progress(progress_signal, f"  - 结束地址: {app_end_address}")
                 
         if not app_load_address:
+            self._flush_progress(progress_signal)
             raise ValueError(f"在Crash日志中找不到应用 {self.binary_name} 的加载地址")
             
-        if progress_signal:
-            progress_signal.emit("\n[2] 检查dSYM文件...")
-            progress_signal.emit(f"  - 路径: {self.dsym_path}")
-            progress_signal.emit(f"  - UUID: {self.binary_uuid}")
+        self._progress(progress_signal, "\n[2] 检查dSYM文件...")
+        self._progress(progress_signal, f"  - 路径: {self.dsym_path}")
+        self._progress(progress_signal, f"  - UUID: {self.binary_uuid}")
         
         # 获取可用的架构
-        if progress_signal:
-            progress_signal.emit("\n[3] 获取二进制文件支持的架构...")
+        self._progress(progress_signal, "\n[3] 获取二进制文件支持的架构...")
             
-        try:
-            result = subprocess.run(
-                ["lipo", "-info", self.binary_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            architectures = []
-            if "Non-fat file" in result.stdout:
-                arch = result.stdout.split("architecture: ")[1].strip()
-                architectures = [arch]
-            else:
-                archs = result.stdout.split("are: ")[1].strip()
-                architectures = archs.split(" ")
-            if progress_signal:
-                progress_signal.emit(f"✓ 支持的架构: {', '.join(architectures)}")
-        except subprocess.CalledProcessError as e:
-            if progress_signal:
-                progress_signal.emit(f"⚠️ 无法获取架构信息，将使用默认架构列表")
-            architectures = ['arm64e', 'arm64', 'x86_64']
+        # 崩溃日志中的镜像UUID与dSYM某个架构切片匹配时，只需尝试该架构
+        arch = self._uuid_to_arch.get(app_image['uuid'].replace('-', '').lower())
+        if arch:
+            architectures = [arch]
+            self._progress(progress_signal, f"✓ 根据UUID匹配到架构: {arch}")
+        elif self.dsym_arch:
+            # dSYM只包含一个架构时其他架构不可能符号化成功，无需再调用lipo
+            architectures = [self.dsym_arch]
+            self._progress(progress_signal, f"✓ dSYM只包含架构: {self.dsym_arch}")
+        else:
+            try:
+                architectures = self._binary_architectures()
+                self._progress(progress_signal, f"✓ 支持的架构: {', '.join(architectures)}")
+            except subprocess.CalledProcessError as e:
+                self._progress(progress_signal, f"⚠️ 无法获取架构信息，将使用默认架构列表")
+                architectures = ['arm64e', 'arm64', 'x86_64']
             
         # 使用 atos 命令进行符号化
-        if progress_signal:
-            progress_signal.emit("\n[4] 开始符号化堆栈...")
+        self._progress(progress_signal, "\n[4] 开始符号化堆栈...")
+        self._flush_progress(progress_signal)
             
-        symbolicated_lines = []
-        frame_count = 0
-        symbolicated_count = 0
-        
-        # 首先收集所有需要符号化的地址
-        addresses_to_symbolicate = {}
-        for line in self.crash_lines:
-            frame_match = re.search(r'^(\d+)\s+(\S+)\s+(0x[0-9a-f]+)\s+(.+)$', line.strip())
-            if frame_match and (frame_match.group(2) == self.binary_name or self.binary_name in frame_match.group(2)):
-                address = frame_match.group(3)
-                if address not in self.symbol_cache:
-                    addresses_to_symbolicate[address] = None
-                    
-        # 批量符号化地址
-        if addresses_to_symbolicate:
-            if progress_signal:
-                progress_signal.emit(f"\n需要符号化 {len(addresses_to_symbolicate)} 个地址...")
-                
+        # 只判断一次哪些堆栈帧属于应用镜像，后续聚合地址和生成输出时只遍历这些帧
+        # 只需要崩溃线程时，其他线程的帧保持原样；Last Exception Backtrace中的帧同样符号化
+        # 各帧按在Crash内容中的顺序排列
+        frames = self._frames
+        if self.crashed_only:
+            frames = [frame for frame in frames if frame['crashed']]
+        app_frames = [
+            frame for frame in frames
+            if self._is_app_frame(frame['binary_name'], frame['address'], app_index)
+        ]
+
+        # 第一遍：按镜像聚合需要符号化的地址，堆栈帧在解析时已经提取
+        # 缓存键使用镜像UUID和相对加载地址的偏移，加载地址不同的Crash文件之间也可以复用
+        addresses_by_image = defaultdict(dict)
+        app_uuid = app_image['uuid'].replace('-', '').lower()
+        app_base = int(app_load_address, 16)
+        for frame in app_frames:
+            address = frame['address']
+            cache_key = (app_uuid, int(address, 16) - app_base)
+            frame['cache_key'] = cache_key
+            if cache_key not in self.symbol_cache and cache_key not in self._unresolved:
+                addresses_by_image[(app_image['name'], app_image['uuid'], app_load_address)][address] = cache_key
+
+        # 先从持久化缓存中查找，命中的地址不再调用atos
+        for (image_name, image_uuid, load_address), addresses in addresses_by_image.items():
+            cached_symbols = self._load_cached_symbols(image_uuid, load_address, addresses)
+            if cached_symbols:
+                for address, symbol in cached_symbols.items():
+                    self.symbol_cache[addresses.pop(address)] = symbol
+                self._progress(progress_signal, f"\n{image_name} 从缓存中找到 {len(cached_symbols)} 个符号")
+
+        # 同时启动各候选架构的atos进程，使它们加载dSYM的时间相互重叠；使用lldb时按需再启动
+        if any(addresses_by_image.values()) and not (use_lldb and lldb is not None):
             for arch in architectures:
-                remaining_addresses = [addr for addr, symbol in addresses_to_symbolicate.items() if symbol is None]
-                if not remaining_addresses:
-                    break
-                    
-                if progress_signal:
-                    progress_signal.emit(f"\n尝试使用 {arch} 架构:")
+                self._start_atos(arch, self.dsym_path)
+                
+        # 第二遍：每个镜像只调用一次atos，一次性解析该镜像内的所有地址
+        for (image_name, image_uuid, load_address), addresses in addresses_by_image.items():
+            remaining_addresses = list(addresses)
+            if not remaining_addresses:
+                continue
+            self._progress(progress_signal, f"\n{image_name} 需要符号化 {len(remaining_addresses)} 个地址...")
+
+            # 多个候选架构时各架构的atos进程相互独立，同时查询，耗时约等于最慢的一个架构；
+            # 使用lldb时依次查询，前一个架构未解析的地址才交给下一个架构
+            if len(architectures) > 1 and not (use_lldb and lldb is not None):
+                with ThreadPoolExecutor(max_workers=len(architectures), thread_name_prefix="arch") as executor:
+                    results = list(executor.map(
+                        lambda arch: self._resolve_with_arch(arch, load_address, remaining_addresses, False),
+                        architectures
+                    ))
+            else:
+                results = []
+                for arch in architectures:
+                    if not remaining_addresses:
+                        break
+                    results.append(self._resolve_with_arch(arch, load_address, remaining_addresses, use_lldb))
+                    remaining_addresses = [addr for addr in remaining_addresses if addr not in results[-1][0]]
                     
-                # 使用dSYM文件批量符号化
-                try:
-                    if progress_signal:
-                        progress_signal.emit("  使用dSYM文件批量符号化...")
-                        
-                    cmd = ["atos", "-arch", arch, "-o", self.dsym_path, "-l", app_load_address] + remaining_addresses
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+            # 按架构的优先顺序合并结果，同一地址使用排在前面的架构的符号
+            # 只有所有架构都明确回答无法解析的地址才记录下来，查询出错或超时的地址下次重试
+            unresolved = set(addresses)
+            for symbols, messages, answered in results:
+                unresolved.intersection_update(answered)
+                for message in messages:
+                    self._progress(progress_signal, message)
+                for addr, symbol in symbols.items():
+                    self.symbol_cache.setdefault(addresses[addr], symbol)
+            self._flush_progress(progress_signal)
+
+            # 将新解析出的符号写入持久化缓存
+            self._save_cached_symbols(image_uuid, load_address, {
+                addr: self.symbol_cache[cache_key]
+                for addr, cache_key in addresses.items() if cache_key in self.symbol_cache
+            })
+            # 记录无法解析的地址，同一镜像的后续Crash文件不再重复查询
+            self._unresolved.update(
+                addresses[addr] for addr in unresolved if addresses[addr] not in self.symbol_cache
+            )
+
+        # 使用符号化结果生成输出，只替换已符号化的堆栈帧行
+        # 通过memoryview切片直接解码，不再为帧之间的每段内容复制一份bytes
+        with memoryview(self.crash_content) as view:
+            symbolicated_count = yield from self._splice_symbols(view, app_frames, progress_signal)
+        frame_count = len(self._frames)
+        
+        self._progress(progress_signal, "\n" + "="*50)
+        self._progress(progress_signal, f"符号化完成")
+        self._progress(progress_signal, f"总帧数: {frame_count}")
+        self._progress(progress_signal, f"成功符号化: {symbolicated_count}")
+        self._progress(progress_signal, f"失败: {frame_count - symbolicated_count}")
+        self._progress(progress_signal, "="*50 + "\n")
+        self._flush_progress(progress_signal)
+        
+        # 最后生成附加的符号化信息
+        yield "".join((
+            "\n\n符号化信息:\n",
+            f"应用名称: {self.binary_name}\n",
+            f"UUID: {self.binary_uuid}\n",
+            f"dSYM路径: {self.dsym_path}\n",
+            f"二进制文件路径: {self.binary_path}\n",
+            f"加载地址: {app_load_address}\n",
+            f"结束地址: {app_end_address}\n",
+            f"支持的架构: {', '.join(architectures)}\n",
+            f"总帧数: {frame_count}\n",
+            f"成功符号化: {symbolicated_count}\n",
+            f"失败: {frame_count - symbolicated_count}\n",
+        ))
+
+    def _splice_symbols(self, view, app_frames, progress_signal=None):
+        """
+        将已符号化的堆栈帧写回Crash内容，其余内容保持原样
+        
+        Args:
+            view: Crash内容的memoryview
+            app_frames: 属于应用镜像的堆栈帧，按在Crash内容中的位置排列，已计算缓存键
+            progress_signal: 进度信号
+            
+        Yields:
+            str: 输出内容片段
+            
+        Returns:
+            int: 成功符号化的帧数
+        """
+        symbolicated_count = 0
+        cursor = 0
+        for frame in app_frames:
+            frame_index = frame['index']
+            cache_key = frame['cache_key']
+            
+            # 使用缓存的符号
+            if cache_key in self.symbol_cache:
+                symbolicated_count += 1
+                # 只替换原符号部分，帧序号、镜像名、地址及其对齐空白直接沿用原内容
+                start, end = frame['span']
+                yield _decode(view[cursor:start], self._encoding)
+                yield self.symbol_cache[cache_key]
+                cursor = end
+                self._progress(progress_signal, f"✓ 帧 {frame_index} 已符号化")
                     
-                    if result.returncode == 0:
-                        symbols = result.stdout.strip().split("\n")
-                        for addr, symbol in zip(remaining_addresses, symbols):
-                            if symbol and symbol != "??" and addr not in symbol:
-                                addresses_to_symbolicate[addr] = symbol
-                                self.symbol_cache[addr] = symbol
-                                
-                except Exception as e:
-                    if progress_signal:
-                        progress_signal.emit(f"  ✗ dSYM批量符号化失败: {str(e)}")
-                        
-                # 对未成功的地址使用二进制文件尝试符号化
-                remaining_addresses = [addr for addr, symbol in addresses_to_symbolicate.items() if symbol is None]
-                if remaining_addresses:
-                    try:
-                        if progress_signal:
-                            progress_signal.emit("  使用二进制文件批量符号化...")
-                            
-                        cmd = ["atos", "-arch", arch, "-o", self.binary_path, "-l", app_load_address] + remaining_addresses
-                        result = subprocess.run(cmd, capture_output=True, text=True)
-                        
-                        if result.returncode == 0:
-                            symbols = result.stdout.strip().split("\n")
-                            for addr, symbol in zip(remaining_addresses, symbols):
-                                if symbol and symbol != "??" and addr not in symbol:
-                                    addresses_to_symbolicate[addr] = symbol
-                                    self.symbol_cache[addr] = symbol
-                                    
-                    except Exception as e:
-                        if progress_signal:
-                            progress_signal.emit(f"  ✗ 二进制文件批量符号化失败: {str(e)}")
-                            
-        # 使用符号化结果生成输出
-        for line in self.crash_lines:
-            frame_match = re.search(r'^(\d+)\s+(\S+)\s+(0x[0-9a-f]+)\s+(.+)$', line.strip())
-            if frame_match:
-                frame_count += 1
-                frame_index = frame_match.group(1)
-                binary_name = frame_match.group(2)
-                address = frame_match.group(3)
-                original_symbol = frame_match.group(4)
-                
-                if binary_name == self.binary_name or self.binary_name in binary_name:
-                    # 使用缓存的符号
-                    if address in self.symbol_cache:
-                        symbolicated_count += 1
-                        line = f"{frame_index} {binary_name} {address} {self.symbol_cache[address]}"
-                        if progress_signal:
-                            progress_signal.emit(f"✓ 帧 {frame_index} 已符号化")
-                            
-            symbolicated_lines.append(line)
-            
-        if progress_signal:
-            progress_signal.emit("\n" + "="*50)
-            progress_signal.emit(f"符号化完成")
-            progress_signal.emit(f"总帧数: {frame_count}")
-            progress_signal.emit(f"成功符号化: {symbolicated_count}")
-            progress_signal.emit(f"失败: {frame_count - symbolicated_count}")
-            progress_signal.emit("="*50 + "\n")
-        
-        # 生成符号化后的内容
-        symbolicated_content = "\n".join(symbolicated_lines)
-        
-        # 添加符号化信息
-        symbolicated_content += "\n\n符号化信息:\n"
-        symbolicated_content += f"应用名称: {self.binary_name}\n"
-        symbolicated_content += f"UUID: {self.binary_uuid}\n"
-        symbolicated_content += f"dSYM路径: {self.dsym_path}\n"
-        symbolicated_content += f"二进制文件路径: {self.binary_path}\n"
-        symbolicated_content += f"加载地址: {app_load_address}\n"
-        symbolicated_content += f"结束地址: {app_end_address}\n"
-        symbolicated_content += f"支持的架构: {', '.join(architectures)}\n"
-        symbolicated_content += f"总帧数: {frame_count}\n"
-        symbolicated_content += f"成功符号化: {symbolicated_count}\n"
-        symbolicated_content += f"失败: {frame_count - symbolicated_count}\n"
-        
-        return symbolicated_content
+        yield _decode(view[cursor:], self._encoding)
+        return symbolicated_count
+
+    def _resolve_with_arch(self, arch, load_address, addresses, use_lldb):
+        """
+        使用指定架构符号化一组地址，先使用dSYM文件，未成功的地址再使用二进制文件
+        
+        可以在线程池中并发调用，进度信息随结果一起返回，由调用方按顺序发送。
+        
+        Args:
+            arch: 架构
+            load_address: 镜像的加载地址
+            addresses: 需要符号化的地址列表
+            use_lldb: 是否最先使用lldb在进程内查询dSYM
+            
+        Returns:
+            tuple: (地址 -> 符号, 进度信息列表, 所有方式都明确无法解析的地址列表)
+        """
+        symbols = {}
+        messages = [f"\n尝试使用 {arch} 架构:"]
+        remaining_addresses = list(addresses)
+        failed = False
+        
+        resolvers = [
+            ("dSYM文件", lambda load, addrs: self._atos_batch(arch, self.dsym_path, load, addrs)),
+            ("二进制文件", lambda load, addrs: self._atos_batch(arch, self.binary_path, load, addrs)),
+        ]
+        if use_lldb and lldb is not None:
+            resolvers.insert(0, ("LLDB", lambda load, addrs: self._lldb_batch(arch, load, addrs)))
             
+        for object_desc, resolve in resolvers:
+            if not remaining_addresses:
+                break
+                
+            messages.append(f"  使用{object_desc}批量符号化...")
+            try:
+                for addr, symbol in zip(remaining_addresses, resolve(load_address, remaining_addresses)):
+                    if _is_symbolized(symbol):
+                        symbols[addr] = symbol
+            except Exception as e:
+                messages.append(f"  ✗ {object_desc}批量符号化失败: {str(e)}")
+                failed = True
+                
+            remaining_addresses = [addr for addr in remaining_addresses if addr not in symbols]
+            
+        # 有一种方式出错时剩余的地址不一定无法解析
+        return symbols, messages, [] if failed else remaining_addresses
+        
+    def _progress(self, progress_signal, message):
+        """
+        缓冲进度信息，累积到一定数量后合并为一次发送
+        
+        Args:
+            progress_signal: 用于发送进度信息的信号
+            message: 进度信息
+        """
+        if not progress_signal:
+            return
+        self._progress_buf.append(message)
+        if len(self._progress_buf) >= PROGRESS_BATCH_SIZE:
+            self._flush_progress(progress_signal)
+            
+    def _flush_progress(self, progress_signal):
+        """发送缓冲区中的所有进度信息，进度回调自身也有缓冲时一并发送"""
+        if progress_signal and self._progress_buf:
+            progress_signal.emit("\n".join(self._progress_buf))
+        self._progress_buf.clear()
+        flush = getattr(progress_signal, "flush", None)
+        if flush is not None:
+            flush()
+        
+    def _binary_architectures(self):
+        """
+        获取二进制文件包含的架构列表
+        
+        Returns:
+            list: 架构名称列表，如 ['arm64']
+        """
+        return list(_binary_archs(self.binary_path, os.path.getmtime(self.binary_path)))
+        
+    def _symbol_db(self):
+        """
+        打开持久化的符号缓存数据库
+        
+        缓存以(镜像UUID, 相对加载地址的偏移)为键，不同Crash文件中相同的帧直接命中，
+        无需再调用atos。
+        
+        Returns:
+            sqlite3.Connection: 数据库连接，无法打开时返回None
+        """
+        if self._symbol_db_conn is None and not self._symbol_db_disabled:
+            try:
+                SYMBOL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(SYMBOL_CACHE_DIR / "symbols.db", check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sym(uuid TEXT, off INTEGER, sym TEXT, PRIMARY KEY(uuid, off))"
+                )
+                self._symbol_db_conn = conn
+            except (OSError, sqlite3.Error) as e:
+                print(f"无法打开符号缓存数据库: {str(e)}")
+                self._symbol_db_disabled = True
+        return self._symbol_db_conn
+        
+    def _load_cached_symbols(self, uuid, load_address, addresses):
+        """
+        从持久化缓存中查找地址对应的符号
+        
+        Args:
+            uuid: 镜像的UUID
+            load_address: 镜像的加载地址
+            addresses: 需要查找的地址列表
+            
+        Returns:
+            dict: 命中缓存的地址 -> 符号
+        """
+        conn = self._symbol_db()
+        if conn is None:
+            return {}
+            
+        uuid = uuid.replace('-', '').lower()
+        base = int(load_address, 16)
+        symbols = {}
+        try:
+            for address in addresses:
+                row = conn.execute(
+                    "SELECT sym FROM sym WHERE uuid=? AND off=?", (uuid, int(address, 16) - base)
+                ).fetchone()
+                if row:
+                    symbols[address] = row[0]
+        except sqlite3.Error as e:
+            print(f"读取符号缓存失败: {str(e)}")
+        return symbols
+        
+    def _save_cached_symbols(self, uuid, load_address, symbols):
+        """
+        将符号化结果写入持久化缓存
+        
+        Args:
+            uuid: 镜像的UUID
+            load_address: 镜像的加载地址
+            symbols: 地址 -> 符号
+        """
+        conn = self._symbol_db()
+        if conn is None or not symbols:
+            return
+            
+        uuid = uuid.replace('-', '').lower()
+        base = int(load_address, 16)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sym VALUES (?, ?, ?)",
+                    [(uuid, int(address, 16) - base, symbol) for address, symbol in symbols.items()]
+                )
+        except sqlite3.Error as e:
+            print(f"写入符号缓存失败: {str(e)}")
+            
+    def _lldb_target(self, arch):
+        """
+        获取指定架构的lldb目标，dSYM的DWARF信息在整个运行期间只加载一次
+        
+        Args:
+            arch: 架构
+            
+        Returns:
+            tuple: (lldb.SBTarget, lldb.SBModule)
+        """
+        # 目标按具体的二进制文件和dSYM区分，切换Archive后不会使用之前的文件查询
+        key = (self.binary_path, self.dsym_path, arch)
+        if key not in self._lldb_targets:
+            if self._lldb_debugger is None:
+                lldb.SBDebugger.Initialize()
+                self._lldb_debugger = lldb.SBDebugger.Create()
+                
+            target = self._lldb_debugger.CreateTargetWithFileAndArch(self.binary_path, arch)
+            if not target or target.GetNumModules() == 0:
+                raise Exception(f"创建lldb目标失败: {self.binary_path} ({arch})")
+                
+            module = target.GetModuleAtIndex(0)
+            # 显式关联dSYM，避免依赖Spotlight查找
+            self._lldb_debugger.HandleCommand(f'target symbols add "{self.dsym_path}"')
+            self._lldb_targets[key] = (target, module)
+        return self._lldb_targets[key]
+        
+    def _lldb_batch(self, arch, load_address, addresses):
+        """
+        使用lldb在进程内批量符号化地址，无需启动atos进程
+        
+        Args:
+            arch: 架构
+            load_address: 镜像的加载地址
+            addresses: 需要符号化的地址列表
+            
+        Returns:
+            list: 与addresses一一对应的符号化结果，失败的地址为None
+        """
+        target, module = self._lldb_target(arch)
+        slide = int(load_address, 16) - module.GetObjectFileHeaderAddress().GetFileAddress()
+        module_name = module.GetFileSpec().GetFilename()
+        
+        symbols = []
+        for address in addresses:
+            # 目标没有加载任何段，减去滑动值后按文件地址解析
+            sb_address = target.ResolveFileAddress(int(address, 16) - slide)
+            context = sb_address.GetSymbolContext(lldb.eSymbolContextEverything)
+            name = context.GetFunction().GetName() or context.GetSymbol().GetName()
+            if not name:
+                symbols.append(None)
+                continue
+                
+            # 与atos的输出格式保持一致
+            symbol = f"{name} (in {module_name})"
+            line_entry = context.GetLineEntry()
+            if line_entry.IsValid() and line_entry.GetFileSpec().GetFilename():
+                symbol += f" ({line_entry.GetFileSpec().GetFilename()}:{line_entry.GetLine()})"
+            symbols.append(symbol)
+        return symbols
+        
+    def _atos_batch(self, arch, object_path, load_address, addresses):
+        """
+        通过常驻的atos进程批量符号化同一镜像内的地址
+
+        Args:
+            arch: 架构名称
+            object_path: dSYM文件或二进制文件的路径
+            load_address: 镜像的加载地址
+            addresses: 需要符号化的地址列表
+
+        Returns:
+            list: 与addresses一一对应的符号化结果，失败的地址为None
+        """
+        return [self._atos_lookup(arch, object_path, load_address, address) for address in addresses]
+
+    def _atos_lookup(self, arch, object_path, load_address, address):
+        """
+        使用常驻的atos进程符号化单个地址
+
+        每个(arch, object_path)只启动一个atos进程，dSYM只需加载一次，
+        后续的Crash文件即使加载地址不同也会复用该进程。
+
+        Args:
+            arch: 架构名称
+            object_path: dSYM文件或二进制文件的路径
+            load_address: 镜像的加载地址
+            address: 需要符号化的地址
+
+        Returns:
+            str: 符号化结果，无法符号化时返回None
+        """
+        key = (arch, object_path)
+        future = self._atos_pool.get(key)
+        if future is None:
+            future = self._start_atos(arch, object_path)
+        try:
+            atos = future.result()
+        except Exception:
+            # 启动失败，下次查询时重新启动
+            del self._atos_pool[key]
+            raise
+
+        # 将地址换算到atos进程启动时使用的加载地址
+        query = hex(int(address, 16) - int(load_address, 16) + atos.load_address)
+        try:
+            symbol = atos.lookup(query)
+        except (OSError, EOFError, TimeoutError):
+            # 进程已失效，下次查询时重新启动
+            atos.close()
+            del self._atos_pool[key]
+            raise
+
+        if not _is_symbolized(symbol):
+            return None
+        return symbol
+
+    def _start_atos(self, arch, object_path):
+        """
+        在后台线程中启动常驻的atos进程
+
+        atos启动时加载dSYM耗时较长，放到线程池中执行，多个进程的启动
+        可以相互重叠，也可以与Crash文件的加载和解析重叠。
+
+        Args:
+            arch: 架构名称
+            object_path: dSYM文件或二进制文件的路径
+
+        Returns:
+            Future: 结果为_AtosProcess的Future
+        """
+        key = (arch, object_path)
+        future = self._atos_pool.get(key)
+        if future is None:
+            future = self._atos_executor.submit(_AtosProcess.start, arch, object_path)
+            self._atos_pool[key] = future
+        return future
+
+    def _release_archive_tools(self):
+        """关闭常驻的atos进程并删除lldb目标，它们加载的是之前的二进制文件和dSYM"""
+        for future in self._atos_pool.values():
+            try:
+                future.result().close()
+            except Exception:
+                pass
+        self._atos_pool.clear()
+        if self._lldb_debugger is not None:
+            for target, _ in self._lldb_targets.values():
+                self._lldb_debugger.DeleteTarget(target)
+        self._lldb_targets.clear()
+        
+    def close(self):
+        """关闭所有常驻的atos进程及lldb调试器"""
+        self._release_archive_tools()
+        self._loaded_archive_key = None
+        if self._symbol_db_conn is not None:
+            self._symbol_db_conn.close()
+            self._symbol_db_conn = None
+        if self._lldb_debugger is not None:
+            lldb.SBDebugger.Destroy(self._lldb_debugger)
+            self._lldb_debugger = None
+
+    def __del__(self):
+        self.close()
+        self._atos_executor.shutdown(wait=False)
+
     def get_crash_info(self):
         """
         获取Crash基本信息
@@ -533,11 +1518,14 @@ class CrashSymbolizer:
     def load_metrickit_json(self, json_path):
         """加载并解析MetricKit JSON文件"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
-            return json_data
-        except json.JSONDecodeError as e:
-            raise Exception(f"JSON格式错误: {str(e)}")
+            st = os.stat(json_path)
+            self.metrickit_json_size = st.st_size
+            return _load_json_cached(os.path.abspath(json_path), st.st_mtime_ns, st.st_size)
+        except ValueError as e:
+            # 包括json.JSONDecodeError和无法按UTF-8解码的内容
+            raise ValueError(f"JSON格式错误: {str(e)}") from e
+        except OSError as e:
+            raise OSError(f"无法读取JSON文件: {str(e)}") from e
         except Exception as e:
             raise Exception(f"无法读取JSON文件: {str(e)}")
             
@@ -550,11 +1538,11 @@ class CrashSymbolizer:
             if isinstance(json_data, list):
                 print("JSON数据是数组格式，使用第一个元素")
                 if not json_data:
-                    raise Exception("JSON数组为空")
+                    raise ValueError("JSON数组为空")
                 json_data = json_data[0]
                 
             if not isinstance(json_data, dict):
-                raise Exception(f"JSON数据格式错误，当前类型: {type(json_data)}")
+                raise ValueError(f"JSON数据格式错误，当前类型: {type(json_data)}")
                 
             # 尝试不同的路径查找崩溃诊断数据
             crash_diagnostic = None
@@ -577,7 +1565,7 @@ class CrashSymbolizer:
                     break
                     
             if not crash_diagnostic:
-                raise Exception("未找到有效的崩溃诊断数据")
+                raise ValueError("未找到有效的崩溃诊断数据")
                 
             # 解析调用栈
             call_stack_tree = None
@@ -596,7 +1584,7 @@ class CrashSymbolizer:
                     break
                     
             if not call_stack_tree:
-                raise Exception("未找到有效的调用栈数据")
+                raise ValueError("未找到有效的调用栈数据")
                 
             # 获取元数据
             meta_data = {}
@@ -636,72 +1624,65 @@ class CrashSymbolizer:
             # 解析二进制镜像和线程信息
             self.binary_images = []
             self.crash_threads = []
-            processed_binaries = set()
+            self._binary_index = {}
             
-            def process_frames(frames, thread_frames, depth=0):
-                if not isinstance(frames, list):
-                    if isinstance(frames, dict):
-                        frames = [frames]
-                    else:
-                        return
-                        
-                for frame in frames:
+            platform_arch = meta_data.get('platformArchitecture', 'arm64')
+            
+            def as_frame_list(frames):
+                if isinstance(frames, list):
+                    return frames
+                return [frames] if isinstance(frames, dict) else []
+                
+            def process_frames(frames, thread_frames):
+                # 使用显式栈代替递归，按先序遍历保持帧的原有顺序
+                stack = [(frame, 0) for frame in reversed(as_frame_list(frames))]
+                while stack:
+                    frame, depth = stack.pop()
                     if not isinstance(frame, dict):
                         continue
                         
                     # 提取二进制信息
-                    binary_info = {}
-                    for key in ['binaryName', 'libraryName', 'imageName']:
-                        if key in frame:
-                            binary_info['name'] = frame[key]
-                            break
-                            
-                    for key in ['binaryUUID', 'uuid', 'imageUUID']:
-                        if key in frame:
-                            binary_info['uuid'] = frame[key]
-                            break
-                            
-                    if binary_info.get('name') and binary_info.get('uuid'):
-                        binary_key = (binary_info['name'], binary_info['uuid'])
-                        if binary_key not in processed_binaries:
-                            processed_binaries.add(binary_key)
+                    binary_name = frame.get('binaryName') or frame.get('libraryName') or frame.get('imageName')
+                    binary_uuid = frame.get('binaryUUID') or frame.get('uuid') or frame.get('imageUUID')
+                    
+                    if binary_name and binary_uuid:
+                        # 驻留名称和UUID，大多数帧属于已出现的镜像，查找时可以直接按对象比较
+                        binary_key = (sys.intern(binary_name), sys.intern(binary_uuid))
+                        if binary_key not in self._binary_index:
+                            self._binary_index[binary_key] = len(self.binary_images)
                             
                             # 计算基地址
-                            address = int(frame.get('address', '0'), 16) if isinstance(frame.get('address'), str) else frame.get('address', 0)
-                            offset = int(frame.get('offsetIntoBinaryTextSegment', '0'), 16) if isinstance(frame.get('offsetIntoBinaryTextSegment'), str) else frame.get('offsetIntoBinaryTextSegment', 0)
+                            address = _hex_to_int(frame.get('address', 0))
+                            offset = _hex_to_int(frame.get('offsetIntoBinaryTextSegment', 0))
                             
                             base_address = address - offset if offset else address
-                            
                             self.binary_images.append({
-                                'name': binary_info['name'],
-                                'uuid': binary_info['uuid'],
-                                'arch': meta_data.get('platformArchitecture', 'arm64'),
+                                'name': binary_key[0],
+                                'uuid': binary_key[1],
+                                'arch': platform_arch,
                                 'base': base_address,
+                                'base_hex': hex(base_address),
                                 'size': frame.get('size', 0)
                             })
                             
-                    # 创建调用帧
-                    frame_info = {
-                        'binary': binary_info.get('name', 'Unknown'),
-                        'address': frame.get('address', '0x0'),
-                        'offset': frame.get('offsetIntoBinaryTextSegment', '0x0'),
+                    # 创建调用帧，确保地址格式正确
+                    address = frame.get('address', '0x0')
+                    offset = frame.get('offsetIntoBinaryTextSegment', '0x0')
+                    thread_frames.append({
+                        'binary': binary_name or 'Unknown',
+                        'address': f"0x{address:x}" if isinstance(address, int) else address,
+                        'offset': f"0x{offset:x}" if isinstance(offset, int) else offset,
                         'symbol': frame.get('symbolName', '') or frame.get('symbol', ''),
                         'depth': depth
-                    }
-                    
-                    # 确保地址格式正确
-                    if isinstance(frame_info['address'], int):
-                        frame_info['address'] = hex(frame_info['address'])
-                    if isinstance(frame_info['offset'], int):
-                        frame_info['offset'] = hex(frame_info['offset'])
-                        
-                    thread_frames.append(frame_info)
+                    })
                     
-                    # 处理子帧
-                    for subframes_key in ['subFrames', 'frames', 'children']:
+                    # 处理子帧，逆序入栈使其按原顺序出栈
+                    children = []
+                    for subframes_key in ('subFrames', 'frames', 'children'):
                         if subframes_key in frame:
-                            process_frames(frame[subframes_key], thread_frames, depth + 1)
-                            
+                            children.extend(as_frame_list(frame[subframes_key]))
+                    stack.extend((child, depth + 1) for child in reversed(children))
+                    
             # 处理调用栈
             if isinstance(call_stack_tree, dict):
                 call_stacks = call_stack_tree.get('callStacks', [call_stack_tree])
@@ -728,7 +1709,12 @@ class CrashSymbolizer:
                     })
                     
             if not self.crash_threads:
-                raise Exception("未能解析出有效的调用帧")
+                raise ValueError("未能解析出有效的调用帧")
+                
+            # 按名称索引二进制镜像，同名镜像使用最先出现的一个
+            self._metrickit_images = {}
+            for image in self.binary_images:
+                self._metrickit_images.setdefault(image['name'], image)
                 
             print(f"\n解析完成:")
             print(f"- 设备: {self.device_info['model']} ({self.device_info['os_version']})")
@@ -736,13 +1722,15 @@ class CrashSymbolizer:
             print(f"- 二进制镜像数: {len(self.binary_images)}")
             print(f"- 线程数: {len(self.crash_threads)}")
             
+        except ValueError as e:
+            raise ValueError(f"解析MetricKit JSON失败: {str(e)}") from e
         except Exception as e:
             raise Exception(f"解析MetricKit JSON失败: {str(e)}")
             
     def symbolize_metrickit(self, progress_callback=None):
         """符号化MetricKit崩溃信息"""
         try:
-            print("\n开始符号化MetricKit崩溃信息...")
+            self._log("\n开始符号化MetricKit崩溃信息...")
             
             output_lines = []
             output_lines.append("崩溃报告\n")
@@ -753,149 +1741,294 @@ class CrashSymbolizer:
             
             # 验证必要的文件和路径
             if not self.binary_path or not os.path.exists(self.binary_path):
-                raise Exception(f"找不到二进制文件: {self.binary_path}")
+                raise FileNotFoundError(f"找不到二进制文件: {self.binary_path}")
             if not self.dsym_path or not os.path.exists(self.dsym_path):
-                raise Exception(f"找不到dSYM文件: {self.dsym_path}")
+                raise FileNotFoundError(f"找不到dSYM文件: {self.dsym_path}")
             
-            print(f"二进制文件: {self.binary_path}")
-            print(f"dSYM文件: {self.dsym_path}")
+            self._log(f"二进制文件: {self.binary_path}")
+            self._log(f"dSYM文件: {self.dsym_path}")
             
             # 获取支持的架构
             try:
-                lipo_result = subprocess.run(
-                    ["lipo", "-info", self.binary_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                architectures = []
-                if "Non-fat file" in lipo_result.stdout:
-                    arch = lipo_result.stdout.split("architecture: ")[1].strip()
-                    architectures = [arch]
-                else:
-                    archs = lipo_result.stdout.split("are: ")[1].strip()
-                    architectures = archs.split(" ")
-                print(f"支持的架构: {', '.join(architectures)}")
+                architectures = self._binary_architectures()
+                self._log(f"支持的架构: {', '.join(architectures)}")
             except Exception as e:
-                print(f"警告: 无法获取架构信息 - {str(e)}")
+                self._log(f"警告: 无法获取架构信息 - {str(e)}")
                 architectures = ['arm64']
             
-            # 符号化每个线程
+            # 先一次性解析所有需要符号化的地址，之后逐帧生成输出时只读取符号缓存
+            self._pre_resolve_all_frames(progress_callback)
+            
+            # 符号化每个线程，此时只读取符号缓存拼接输出
+            # 循环内频繁使用的属性先取到局部变量；不输出日志时不构造日志字符串
+            symbol_cache = self.symbol_cache
+            images = self._metrickit_images
+            verbose = self.verbose
+            append = output_lines.append
+            
             for thread in self.crash_threads:
                 thread_header = f"\n{'崩溃' if thread['crashed'] else ''}线程 {thread['number']} 回溯:"
-                output_lines.append(thread_header)
-                print(thread_header)
+                append(thread_header)
+                self._log(thread_header)
+                skip_thread = self.crashed_only and not thread['crashed']
                 
                 for i, frame in enumerate(thread['frames']):
+                    binary = frame['binary']
+                    address = frame['address']
+                    
                     # 查找对应的二进制镜像
-                    binary_image = next(
-                        (img for img in self.binary_images if img['name'] == frame['binary']),
-                        None
-                    )
+                    binary_image = images.get(binary)
                     
                     if not binary_image:
-                        print(f"警告: 找不到二进制镜像 {frame['binary']}")
-                        output_lines.append(f"{i:3d} {frame['binary']} {frame['address']} {frame['symbol'] or '<未知符号>'}")
+                        if verbose:
+                            self._log(f"警告: 找不到二进制镜像 {binary}")
+                        append(f"{i:3d} {binary} {address} {frame['symbol'] or '<未知符号>'}")
                         continue
                         
-                    try:
-                        # 确保地址格式正确
-                        if isinstance(frame['address'], str):
-                            if not frame['address'].startswith('0x'):
-                                frame['address'] = f"0x{frame['address']}"
-                        else:
-                            frame['address'] = hex(frame['address'])
-                            
-                        # 计算相对地址
-                        frame_address = int(frame['address'], 16)
-                        base_address = binary_image['base']
-                        relative_address = frame_address - base_address
+                    # 系统库的帧以及只需要崩溃线程时其他线程的帧不调用atos
+                    if skip_thread or self._is_system_binary(binary):
+                        append(f"{i:3d} {binary} {address} {frame['symbol'] or '<未知符号>'}")
+                        continue
                         
+                    try:
                         if progress_callback:
-                            progress_callback.emit(f"正在符号化地址: {frame['address']}...")
-                            
-                        print(f"符号化: {frame['binary']} @ {frame['address']} (base: {hex(base_address)})")
-                        
-                        # 使用缓存
-                        cache_key = f"{hex(relative_address)}_{binary_image['arch']}_{hex(base_address)}"
-                        if cache_key in self.symbol_cache:
-                            symbol = self.symbol_cache[cache_key]
-                            print(f"使用缓存的符号: {symbol}")
-                        else:
-                            # 尝试使用不同的符号化方法
-                            symbol = None
+                            progress_callback.emit(f"正在符号化地址: {address}...")
                             
-                            # 1. 首先尝试使用 atos 和 dSYM
-                            try:
-                                atos_cmd = [
-                                    "atos",
-                                    "-arch", binary_image['arch'],
-                                    "-o", self.binary_path,
-                                    "-l", hex(base_address)
-                                ]
+                        # 使用缓存，缓存键在分组时已经计算
+                        symbol = symbol_cache.get(frame['cache_key'])
+                        if verbose:
+                            self._log(f"符号化: {binary} @ {address} (base: {binary_image['base_hex']})")
+                            if symbol is not None:
+                                self._log(f"使用缓存的符号: {symbol}")
+                        if symbol is None:
+                            # atos和lldb都无法解析，使用原始符号
+                            symbol = frame['symbol'] or '<未知符号>'
+                            if verbose:
+                                self._log(f"使用原始符号: {symbol}")
                                 
-                                if self.dsym_path:
-                                    atos_cmd.extend(["-d", self.dsym_path])
-                                    
-                                atos_cmd.append(frame['address'])
-                                
-                                atos_result = subprocess.run(
-                                    atos_cmd,
-                                    capture_output=True,
-                                    text=True,
-                                    check=True
-                                )
-                                
-                                symbol = atos_result.stdout.strip()
-                                if symbol and symbol != "??" and frame['address'] not in symbol:
-                                    print(f"atos 符号化成功: {symbol}")
-                                else:
-                                    symbol = None
-                                    
-                            except Exception as e:
-                                print(f"atos 符号化失败: {str(e)}")
-                                
-                            # 2. 如果 atos 失败，尝试使用 lldb
-                            if not symbol:
-                                try:
-                                    lldb_cmd = [
-                                        "lldb",
-                                        "--batch",
-                                        "-o", f"image lookup --address {frame['address']}"
-                                    ]
-                                    
-                                    lldb_result = subprocess.run(
-                                        lldb_cmd,
-                                        capture_output=True,
-                                        text=True
-                                    )
-                                    
-                                    if "Summary: " in lldb_result.stdout:
-                                        symbol = re.search(r'Summary: (.*)', lldb_result.stdout).group(1)
-                                        print(f"lldb 符号化成功: {symbol}")
-                                        
-                                except Exception as e:
-                                    print(f"lldb 符号化失败: {str(e)}")
-                                    
-                            # 3. 如果都失败了，使用原始符号
-                            if not symbol or symbol == "??" or frame['address'] in symbol:
-                                symbol = frame['symbol'] or '<未知符号>'
-                                print(f"使用原始符号: {symbol}")
-                                
-                            # 缓存结果
-                            self.symbol_cache[cache_key] = symbol
-                            
-                        output_lines.append(f"{i:3d} {frame['binary']} {frame['address']} {symbol}")
+                        append(f"{i:3d} {binary} {address} {symbol}")
                         
                     except Exception as e:
-                        print(f"符号化帧 {i} 失败: {str(e)}")
-                        output_lines.append(f"{i:3d} {frame['binary']} {frame['address']} {frame['symbol'] or '<符号化失败>'}")
+                        self._log(f"符号化帧 {i} 失败: {str(e)}")
+                        append(f"{i:3d} {binary} {address} {frame['symbol'] or '<符号化失败>'}")
                         
             return "\n".join(output_lines)
             
+        except OSError as e:
+            raise OSError(f"符号化MetricKit崩溃信息失败: {str(e)}") from e
         except Exception as e:
             raise Exception(f"符号化MetricKit崩溃信息失败: {str(e)}")
             
+    def _pre_resolve_all_frames(self, progress_callback=None):
+        """
+        在生成输出之前解析MetricKit所有线程中需要符号化的地址
+        
+        按镜像分组后每组只调用一次atos，atos未能解析的地址再并发使用lldb查询。
+        成功的结果写入符号缓存，工具明确回答无法解析的地址记录下来，查询出错或超时的地址下次重试。
+        
+        Args:
+            progress_callback: 进度回调
+        """
+        # 按镜像分组，每个镜像的地址只调用一次atos，结果写入符号缓存
+        image_groups = self._group_frames_by_image(
+            frame for thread in self.crash_threads
+            if thread['crashed'] or not self.crashed_only
+            for frame in thread['frames']
+        )
+        total_count = sum(len(addresses) for addresses in image_groups.values())
+        resolved_count = 0
+        atos_unresolved = {}  # 镜像 -> atos明确无法解析的缓存键
+        for (binary_name, arch, base_address), addresses in image_groups.items():
+            # 先从持久化缓存中查找，命中的地址不再调用atos
+            image_uuid = self._metrickit_images[binary_name]['uuid']
+            remaining = dict(addresses)
+            if image_uuid:
+                cached_symbols = self._load_cached_symbols(image_uuid, base_address, addresses)
+                for address, symbol in cached_symbols.items():
+                    self.symbol_cache[remaining.pop(address)] = symbol
+                if cached_symbols:
+                    self._log(f"{binary_name} 从缓存中找到 {len(cached_symbols)} 个符号")
+                    
+            if remaining:
+                self._log(f"批量符号化: {binary_name} ({arch}, base: {base_address}) 共 {len(remaining)} 个地址")
+                atos_unresolved[(binary_name, arch, base_address)] = self._atos_image_batch(arch, base_address, remaining)
+                if image_uuid:
+                    # 将新解析出的符号写入持久化缓存
+                    self._save_cached_symbols(image_uuid, base_address, {
+                        address: self.symbol_cache[cache_key]
+                        for address, cache_key in remaining.items() if cache_key in self.symbol_cache
+                    })
+            resolved_count += len(addresses)
+            self._progress(progress_callback, f"已解析 {resolved_count}/{total_count} 个地址")
+            # 下一个镜像或lldb查询耗时较长，先把进度显示出来
+            self._flush_progress(progress_callback)
+            
+        # atos未能解析的地址交给lldb，每个镜像只启动一个lldb进程，同时运行的lldb进程数有上限
+        # lldb按应用的二进制文件载入镜像，其他镜像的地址无法通过它解析
+        pending = {}
+        for (binary_name, arch, base_address), addresses in image_groups.items():
+            remaining = {
+                address: cache_key for address, cache_key in addresses.items()
+                if cache_key not in self.symbol_cache
+            }
+            if not remaining:
+                continue
+            if binary_name != self.binary_name or self.binary_uuid in self._lldb_failed_dsyms:
+                image_uuid = self._metrickit_images[binary_name]['uuid']
+                self._unresolved.update(
+                    (image_uuid, cache_key)
+                    for cache_key in atos_unresolved.get((binary_name, arch, base_address), ())
+                )
+            else:
+                pending[(arch, base_address)] = remaining
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(len(pending), LLDB_MAX_PROCESSES), thread_name_prefix="lldb") as executor:
+                results = list(executor.map(
+                    lambda item: self._lldb_lookup_image(item[0][0], item[0][1], list(item[1])),
+                    pending.items()
+                ))
+            image_uuid = self._metrickit_images[self.binary_name]['uuid']
+            resolved = failed = False
+            for remaining, symbols in zip(pending.values(), results):
+                if symbols is None:
+                    # lldb出错或超时，这些地址下次重试
+                    failed = True
+                    continue
+                for cache_key, symbol in zip(remaining.values(), symbols):
+                    if symbol:
+                        self.symbol_cache[cache_key] = symbol
+                        resolved = True
+                    else:
+                        self._unresolved.add((image_uuid, cache_key))
+            # lldb启动很慢，正常运行却一个地址都没有解析出来时，这个dSYM之后不再使用lldb
+            if not resolved and not failed:
+                self._lldb_failed_dsyms.add(self.binary_uuid)
+
+    def _log(self, message):
+        """
+        输出MetricKit符号化的详细日志，verbose为False时不输出
+        
+        Args:
+            message: 日志内容
+        """
+        if self.verbose:
+            print(message)
+            
+    def _is_system_binary(self, binary_name):
+        """
+        判断镜像是否为系统库或用户指定跳过的镜像，这些镜像的帧不调用atos
+        
+        Args:
+            binary_name: 镜像名称
+            
+        Returns:
+            bool: 是否跳过符号化
+        """
+        return (
+            binary_name in SYSTEM_BINARIES
+            or binary_name.startswith(SYSTEM_BINARY_PREFIXES)
+            or binary_name in self.avoid_libraries
+        )
+        
+    def _group_frames_by_image(self, frames):
+        """
+        将需要调用atos的MetricKit帧按镜像分组
+        
+        系统库的帧和已有缓存的地址不参与分组，同一镜像内的地址去重后保持原有顺序。
+        
+        Args:
+            frames: MetricKit帧的可迭代对象
+            
+        Returns:
+            dict: (二进制名称, 架构, 十六进制加载地址) -> {地址: 缓存键}
+        """
+        groups = defaultdict(dict)
+        for frame in frames:
+            binary_image = self._metrickit_images.get(frame['binary'])
+            if not binary_image:
+                continue
+            if self._is_system_binary(frame['binary']):
+                continue
+                
+            # 确保地址格式正确
+            if isinstance(frame['address'], str):
+                if not frame['address'].startswith('0x'):
+                    frame['address'] = f"0x{frame['address']}"
+            else:
+                frame['address'] = hex(frame['address'])
+                
+            # 缓存键只计算一次，保存在帧中供生成输出时使用
+            relative_address = _parse_hex(frame['address']) - binary_image['base']
+            cache_key = f"{hex(relative_address)}_{binary_image['arch']}_{binary_image['base_hex']}"
+            frame['cache_key'] = cache_key
+            if cache_key in self.symbol_cache or (binary_image['uuid'], cache_key) in self._unresolved:
+                continue
+                
+            groups[(frame['binary'], binary_image['arch'], binary_image['base_hex'])][frame['address']] = cache_key
+        return dict(groups)
+        
+    def _atos_image_batch(self, arch, base_address, addresses):
+        """
+        通过常驻的atos进程符号化同一镜像内的所有地址，依次使用dSYM文件和二进制文件
+        
+        成功符号化的地址写入符号缓存，未成功的地址留给调用方继续处理。
+        
+        Args:
+            arch: 架构名称
+            base_address: 镜像的十六进制加载地址
+            addresses: 需要符号化的地址 -> 缓存键
+            
+        Returns:
+            list: atos明确无法解析的地址的缓存键，查询出错时不包含未查询完的地址
+        """
+        remaining_addresses = list(addresses)
+        for object_path in (self.dsym_path, self.binary_path):
+            if not object_path or not remaining_addresses:
+                continue
+                
+            try:
+                symbols = self._atos_batch(arch, object_path, base_address, remaining_addresses)
+            except Exception as e:
+                self._log(f"atos 符号化失败: {str(e)}")
+                return []
+                
+            unresolved = []
+            for address, symbol in zip(remaining_addresses, symbols):
+                if symbol:
+                    self._log(f"atos 符号化成功: {address} -> {symbol}")
+                    self.symbol_cache[addresses[address]] = symbol
+                else:
+                    unresolved.append(address)
+            remaining_addresses = unresolved
+        return [addresses[address] for address in remaining_addresses]
+            
+    def _lldb_lookup_image(self, arch, base_address, addresses):
+        """
+        使用一个lldb进程查询应用镜像内的多个地址的符号，可以在线程池中并发调用
+        
+        Args:
+            arch: 架构名称
+            base_address: 镜像的十六进制加载地址
+            addresses: 需要符号化的地址列表
+            
+        Returns:
+            list: 与addresses一一对应的符号化结果，无法符号化的地址为None；lldb出错或超时时返回None
+        """
+        try:
+            summaries = _lldb_batch_lookup(arch, self.binary_path, self.dsym_path, base_address, addresses)
+        except Exception as e:
+            self._log(f"lldb 符号化失败: {str(e)}")
+            return None
+            
+        symbols = []
+        for address, symbol in zip(addresses, summaries):
+            if _is_symbolized(symbol):
+                self._log(f"lldb 符号化成功: {address} -> {symbol}")
+                symbols.append(symbol)
+            else:
+                symbols.append(None)
+        return symbols
+        
     def _symbolicate_address(self, address, arch, load_address):
         """改进的地址符号化方法"""
         if not address:
@@ -907,55 +2040,89 @@ class CrashSymbolizer:
             return self.symbol_cache[cache_key]
         
         try:
-            # 计算实际地址
-            slide = int(address, 16) - int(load_address, 16)
-            actual_address = hex(slide)
-            
-            # 使用 atos 命令进行符号化
-            atos_cmd = [
-                "atos",
-                "-arch", arch if arch else "arm64",
-                "-o", self.binary_path,
-                "-l", load_address,
-                address
-            ]
-            
-            if self.dsym_path:
-                atos_cmd.extend(["-d", self.dsym_path])
-            
-            result = subprocess.run(
-                atos_cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            symbol = result.stdout.strip()
+            # 使用常驻的atos进程进行符号化
+            try:
+                symbol = self._atos_lookup(arch if arch else "arm64", self.dsym_path or self.binary_path, load_address, address)
+            except (OSError, EOFError, TimeoutError) as e:
+                return f"<符号化失败: {str(e)}>"
+            symbol = symbol or address
             
             # 如果返回的是十六进制地址，说明符号化失败
-            if re.match(r'^0x[0-9a-f]+$', symbol):
+            if _HEXADDR_RE.match(symbol):
                 # 尝试使用 lldb 进行符号化
-                lldb_cmd = [
-                    "lldb",
-                    "--batch",
-                    "-o", f"image lookup --address {address}"
-                ]
-                
-                lldb_result = subprocess.run(
-                    lldb_cmd,
-                    capture_output=True,
-                    text=True
-                )
+                symbols = self._lldb_lookup_image(arch if arch else "arm64", load_address, [address])
+                symbol = (symbols and symbols[0]) or symbol
                 
-                # 解析 lldb 输出
-                if "Summary: " in lldb_result.stdout:
-                    symbol = re.search(r'Summary: (.*)', lldb_result.stdout).group(1)
-                    
             # 缓存结果
             self.symbol_cache[cache_key] = symbol
             return symbol
             
-        except subprocess.CalledProcessError as e:
+        except subprocess.TimeoutExpired as e:
             return f"<符号化失败: {str(e)}>"
         except Exception as e:
-            return f"<错误: {str(e)}>" 
\ No newline at end of file
+            return f"<错误: {str(e)}>" 
+
+
+# 批量符号化时每个工作进程内常驻的符号化器
+_worker_symbolizer = None
+
+
+def _worker_init(state):
+    """
+    初始化批量符号化的工作进程，直接使用主进程解析好的Archive信息
+    
+    Args:
+        state: 主进程CrashSymbolizer的Archive相关属性
+    """
+    global _worker_symbolizer
+    _worker_symbolizer = CrashSymbolizer()
+    for name, value in state.items():
+        setattr(_worker_symbolizer, name, value)
+        
+        
+def _worker_symbolize(crash_path):
+    """
+    在工作进程中符号化一个Crash文件
+    
+    Args:
+        crash_path: Crash文件的路径
+        
+    Returns:
+        str: 符号化后的Crash内容
+    """
+    symbolizer = _worker_symbolizer
+    symbolizer.parse_crash(symbolizer.load_crash_file(crash_path))
+    return symbolizer.symbolize()
+    
+    
+def symbolize_batch(archive_path, crash_paths, max_workers=None):
+    """
+    使用多个进程批量符号化同一个Archive对应的多个Crash文件
+    
+    Archive只在主进程中加载一次，工作进程直接使用加载结果，各自维护常驻的atos进程，
+    符号的持久化缓存在进程之间共享。
+    
+    Args:
+        archive_path: .xcarchive文件的路径
+        crash_paths: Crash文件路径列表
+        max_workers: 工作进程数，默认为CPU核数
+        
+    Returns:
+        list: 与crash_paths一一对应的符号化结果
+    """
+    symbolizer = CrashSymbolizer()
+    try:
+        symbolizer.load_archive(archive_path)
+        state = {
+            'dsym_path': symbolizer.dsym_path,
+            'binary_path': symbolizer.binary_path,
+            'binary_name': symbolizer.binary_name,
+            'binary_uuid': symbolizer.binary_uuid,
+            '_uuid_to_arch': symbolizer._uuid_to_arch,
+            'dsym_arch': symbolizer.dsym_arch,
+        }
+    finally:
+        symbolizer.close()
+        
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_worker_init, initargs=(state,)) as pool:
+        return list(pool.map(_worker_symbolize, crash_paths))
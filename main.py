@@ -3,19 +3,132 @@
 
 import sys
 import os
+import traceback
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QPushButton, QLabel, QFileDialog, 
-                           QRadioButton, QButtonGroup, QTextEdit, QSplitter)
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
+                           QRadioButton, QButtonGroup, QPlainTextEdit, QSplitter,
+                           QCheckBox)
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QThread, QRunnable, QThreadPool, QTimer, QUrl
+from PyQt6.QtGui import QDesktopServices
 from crash_symbolizer import CrashSymbolizer
+from pipeline import run_crash_pipeline, run_metrickit_pipeline
 
 class ProgressCallback(QObject):
     progress_signal = pyqtSignal(str)
     
+    # 缓冲的进度信息达到条数上限时合并为一次发送，其余的在各阶段开始前由flush发送
+    BATCH_SIZE = 32
+    
+    def __init__(self):
+        super().__init__()
+        self._buf = []
+    
     def emit(self, message):
-        self.progress_signal.emit(message)
+        self._buf.append(message)
+        if len(self._buf) >= self.BATCH_SIZE:
+            self.flush()
+            
+    def flush(self):
+        """发送缓冲区中的所有进度信息"""
+        if self._buf:
+            self.progress_signal.emit("\n".join(self._buf))
+            self._buf.clear()
+
+class SymbolizationThread(QThread):
+    """在后台线程中执行符号化，避免阻塞界面；同一个线程对象和符号化器在多次运行之间复用"""
+    result_signal = pyqtSignal(str)
+    
+    def __init__(self, symbolizer, progress_callback):
+        super().__init__()
+        self.symbolizer = symbolizer
+        self.progress_callback = progress_callback
+        self.archive_path = None
+        self.file_path = None
+        self.is_crash = True
+        self.symbolicated_content = None
+        
+    def set_paths(self, archive_path, file_path, is_crash):
+        """设置本次运行使用的文件，只能在线程未运行时调用"""
+        self.archive_path = archive_path
+        self.file_path = file_path
+        self.is_crash = is_crash
+        
+    def run(self):
+        """执行符号化过程，进度通过progress_callback发送，结果通过result_signal发送"""
+        self.symbolicated_content = None
+        try:
+            # 根据选择的解析方式处理文件
+            if self.is_crash:
+                self.symbolicated_content = run_crash_pipeline(
+                    self.symbolizer, self.archive_path, self.file_path, self.progress_callback)
+            else:
+                self.symbolicated_content = run_metrickit_pipeline(
+                    self.symbolizer, self.archive_path, self.file_path, self.progress_callback)
+                
+            self.progress_callback.flush()
+            self.result_signal.emit(self.symbolicated_content or "")
+            
+        except (OSError, ValueError) as e:
+            # 文件不存在、JSON格式错误等常见错误只显示错误信息
+            self.progress_callback.emit(f"\n错误: {str(e)}")
+            self.progress_callback.flush()
+        except Exception as e:
+            self.progress_callback.emit(f"\n错误: {str(e)}")
+            self.progress_callback.emit(traceback.format_exc())
+            self.progress_callback.flush()
+
+class PreviewSignals(QObject):
+    content_ready = pyqtSignal(str, str)  # (文件路径, 文件内容)
+
+class FilePreviewLoader(QRunnable):
+    """在线程池中读取原始文件内容用于显示，过大的文件只读取开头部分"""
+    MAX_PREVIEW_BYTES = 64 * 1024
+    
+    def __init__(self, file_path, signals):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = signals
+        
+    def run(self):
+        # 只读取一次原始字节，无法按UTF-8解码的部分直接替换，不再因编码问题无法显示
+        try:
+            file_size = os.path.getsize(self.file_path)
+            with open(self.file_path, 'rb') as f:
+                content = f.read(self.MAX_PREVIEW_BYTES).decode('utf-8', errors='replace')
+            if file_size > self.MAX_PREVIEW_BYTES:
+                content += f"\n\n[... 仅显示前 {self.MAX_PREVIEW_BYTES // 1024} KB (共 {file_size} 字节)，符号化时解析完整文件，可点击“在外部打开”查看 ...]"
+        except Exception as e:
+            content = f"无法读取文件内容: {str(e)}"
+        self.signals.content_ready.emit(self.file_path, content)
+
+class ExportSignals(QObject):
+    finished = pyqtSignal(str, str)  # (文件路径, 错误信息，成功时为空)
+
+class ExportRunnable(QRunnable):
+    """在线程池中将解析结果分块写入文件"""
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, content, file_path, signals):
+        super().__init__()
+        self.content = content
+        self.file_path = file_path
+        self.signals = signals
+        
+    def run(self):
+        # 每次只编码写入一小段，不为整个结果生成一份编码后的副本
+        try:
+            with open(self.file_path, "w", encoding="utf-8", buffering=self.CHUNK_SIZE) as f:
+                for start in range(0, len(self.content), self.CHUNK_SIZE):
+                    f.write(self.content[start:start + self.CHUNK_SIZE])
+            error = ""
+        except Exception as e:
+            error = str(e)
+        self.signals.finished.emit(self.file_path, error)
 
 class MainWindow(QMainWindow):
+    # 解析结果区域最多显示的字符数
+    MAX_RESULT_PREVIEW_CHARS = 1_000_000
+    
     def __init__(self):
         super().__init__()
         self.initUI()
@@ -45,6 +158,10 @@ class MainWindow(QMainWindow):
         parse_type_layout.addWidget(QLabel("解析方式:"))
         parse_type_layout.addWidget(self.crash_radio)
         parse_type_layout.addWidget(self.json_radio)
+        
+        # 只符号化崩溃线程，其他线程保留原始符号
+        self.crashed_only_checkbox = QCheckBox("只符号化崩溃线程")
+        parse_type_layout.addWidget(self.crashed_only_checkbox)
         parse_type_layout.addStretch()
         
         top_layout.addLayout(parse_type_layout)
@@ -73,6 +190,12 @@ class MainWindow(QMainWindow):
         self.crash_json_layout.addWidget(self.crash_json_label)
         self.crash_json_layout.addWidget(self.select_crash_json_btn)
         
+        # 原始文件只预览开头部分，完整内容用系统默认程序打开
+        self.open_external_btn = QPushButton("在外部打开")
+        self.open_external_btn.clicked.connect(self.open_crash_json_externally)
+        self.open_external_btn.setEnabled(False)
+        self.crash_json_layout.addWidget(self.open_external_btn)
+        
         top_layout.addLayout(self.crash_json_layout)
         
         # 按钮区域
@@ -108,7 +231,7 @@ class MainWindow(QMainWindow):
         original_widget = QWidget()
         original_layout = QVBoxLayout(original_widget)
         original_layout.addWidget(QLabel("原始文件内容"))
-        self.original_text = QTextEdit()
+        self.original_text = QPlainTextEdit()
         self.original_text.setReadOnly(True)
         original_layout.addWidget(self.original_text)
         content_splitter.addWidget(original_widget)
@@ -117,7 +240,7 @@ class MainWindow(QMainWindow):
         result_widget = QWidget()
         result_layout = QVBoxLayout(result_widget)
         result_layout.addWidget(QLabel("解析结果"))
-        self.result_text = QTextEdit()
+        self.result_text = QPlainTextEdit()
         self.result_text.setReadOnly(True)
         result_layout.addWidget(self.result_text)
         content_splitter.addWidget(result_widget)
@@ -129,8 +252,10 @@ class MainWindow(QMainWindow):
         progress_widget = QWidget()
         progress_layout = QVBoxLayout(progress_widget)
         progress_layout.addWidget(QLabel("解析进度"))
-        self.progress_text = QTextEdit()
+        self.progress_text = QPlainTextEdit()
         self.progress_text.setReadOnly(True)
+        # 只保留最近的进度信息，避免文档无限增长
+        self.progress_text.setMaximumBlockCount(5000)
         progress_layout.addWidget(self.progress_text)
         
         # 将内容区域和进度区域添加到垂直分割器
@@ -151,10 +276,32 @@ class MainWindow(QMainWindow):
         self.crash_json_path = None
         self.symbolicated_content = None
         
+        # 进度信息缓冲，每80毫秒最多写入一次进度显示区域
+        self._progress_buffer = []
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(80)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.timeout.connect(self.flush_progress)
+        
         # 创建符号化器和进度回调
-        self.symbolizer = CrashSymbolizer()
+        self.symbolizer = CrashSymbolizer(verbose=False)
         self.progress_callback = ProgressCallback()
-        self.progress_callback.progress_signal.connect(self.update_progress)
+        # 进度信息由符号化线程发出，显式使用队列连接，总是在界面线程中处理
+        self.progress_callback.progress_signal.connect(self.update_progress, Qt.ConnectionType.QueuedConnection)
+        
+        # 符号化线程只创建一次，与符号化器一起在多次运行之间复用
+        # 符号缓存按镜像UUID和偏移保存，加载地址不同的Crash文件之间也能复用
+        self.symbolization_thread = SymbolizationThread(self.symbolizer, self.progress_callback)
+        self.symbolization_thread.result_signal.connect(self.show_result)
+        self.symbolization_thread.finished.connect(self.flush_progress)
+        
+        # 原始文件内容在后台读取
+        self.preview_signals = PreviewSignals()
+        self.preview_signals.content_ready.connect(self.show_preview)
+        
+        # 解析结果在后台导出
+        self.export_signals = ExportSignals()
+        self.export_signals.finished.connect(self.export_finished)
         
     def update_file_selection(self):
         """更新文件选择按钮的文本"""
@@ -163,6 +310,7 @@ class MainWindow(QMainWindow):
         if self.crash_json_path:
             self.crash_json_path = None
             self.crash_json_label.setText("未选择文件")
+            self.open_external_btn.setEnabled(False)
             self.original_text.clear()
             
     def select_archive_file(self):
@@ -189,23 +337,40 @@ class MainWindow(QMainWindow):
         if file_path:
             self.crash_json_path = file_path
             self.crash_json_label.setText(os.path.basename(file_path))
-            # 显示原始文件内容
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    self.original_text.setText(content)
-            except Exception as e:
-                self.original_text.setText(f"无法读取文件内容: {str(e)}")
+            self.open_external_btn.setEnabled(True)
+            # 在线程池中读取原始文件内容，读取完成后再显示；符号化仍使用完整的文件
+            self.original_text.setPlainText("正在读取文件内容...")
+            QThreadPool.globalInstance().start(FilePreviewLoader(file_path, self.preview_signals))
+            
+    def open_crash_json_externally(self):
+        """用系统默认程序打开选择的Crash或JSON文件"""
+        if self.crash_json_path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(self.crash_json_path))
+            
+    def show_preview(self, file_path, content):
+        """显示原始文件内容，已经选择了其他文件时忽略"""
+        if file_path == self.crash_json_path:
+            self.original_text.setPlainText(content)
             
     def update_progress(self, message):
-        """更新进度显示"""
-        self.progress_text.append(message)
+        """更新进度显示，信息先缓冲，由定时器合并后一次性写入"""
+        self._progress_buffer.append(message)
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+            
+    def flush_progress(self):
+        """将缓冲的进度信息写入进度显示区域"""
+        if not self._progress_buffer:
+            return
+        self.progress_text.appendPlainText("\n".join(self._progress_buffer))
+        self._progress_buffer.clear()
         # 滚动到底部
         scrollbar = self.progress_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
         
     def clear_all(self):
         """清空所有显示区域"""
+        self._progress_buffer.clear()
         self.progress_text.clear()
         self.original_text.clear()
         self.result_text.clear()
@@ -226,12 +391,15 @@ class MainWindow(QMainWindow):
             "文本文件 (*.txt)"
         )
         if file_path:
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.symbolicated_content)
-                self.update_progress(f"\n✓ 解析结果已导出到: {file_path}")
-            except Exception as e:
-                self.update_progress(f"\n导出文件时出错: {str(e)}")
+            # 在线程池中写入文件，写入完成后再报告结果
+            QThreadPool.globalInstance().start(ExportRunnable(self.symbolicated_content, file_path, self.export_signals))
+            
+    def export_finished(self, file_path, error):
+        """报告导出结果"""
+        if error:
+            self.update_progress(f"\n导出文件时出错: {error}")
+        else:
+            self.update_progress(f"\n✓ 解析结果已导出到: {file_path}")
             
     def start_symbolization(self):
         """开始符号化过程"""
@@ -239,64 +407,31 @@ class MainWindow(QMainWindow):
             self.update_progress("错误: 请先选择所需的文件")
             return
             
+        if self.symbolization_thread.isRunning():
+            self.update_progress("符号化正在进行中，请等待完成")
+            return
+            
+        self._progress_buffer.clear()
         self.progress_text.clear()
         self.result_text.clear()
         self.symbolicated_content = None
         self.export_btn.setEnabled(False)
         self.update_progress("开始符号化过程...\n")
         
-        try:
-            # 加载Archive文件
-            self.update_progress("[1] 加载Archive文件...")
-            self.symbolizer.load_archive(self.archive_path)
-            self.update_progress(f"✓ Archive加载成功")
-            self.update_progress(f"  - 应用名称: {self.symbolizer.binary_name}")
-            self.update_progress(f"  - dSYM路径: {self.symbolizer.dsym_path}")
-            self.update_progress(f"  - UUID: {self.symbolizer.binary_uuid}\n")
-            
-            # 根据选择的解析方式处理文件
-            if self.crash_radio.isChecked():
-                # Crash文件解析
-                self.update_progress("[2] 加载Crash文件...")
-                crash_content = self.symbolizer.load_crash_file(self.crash_json_path)
-                self.update_progress("✓ Crash文件加载成功")
-                self.update_progress(f"  - 文件大小: {len(crash_content)} 字节\n")
-                
-                self.update_progress("[3] 解析Crash信息...")
-                self.symbolizer.parse_crash(crash_content)
-                self.update_progress("✓ 解析完成\n")
-                
-                self.update_progress("[4] 开始符号化...")
-                self.symbolicated_content = self.symbolizer.symbolize(self.progress_callback)
-            else:
-                # JSON文件解析
-                self.update_progress("[2] 加载MetricKit JSON文件...")
-                json_data = self.symbolizer.load_metrickit_json(self.crash_json_path)
-                self.update_progress("✓ JSON文件加载成功")
-                self.update_progress(f"  - 文件大小: {os.path.getsize(self.crash_json_path)} 字节\n")
-                
-                self.update_progress("[3] 解析崩溃信息...")
-                self.symbolizer.parse_metrickit_crash(json_data)
-                crash_info = self.symbolizer.get_crash_info()
-                self.update_progress("✓ 解析完成")
-                if crash_info:
-                    self.update_progress(f"  - 设备型号: {crash_info.get('deviceType', 'Unknown')}")
-                    self.update_progress(f"  - 系统版本: {crash_info.get('osVersion', 'Unknown')}")
-                    self.update_progress(f"  - 应用版本: {crash_info.get('appVersion', 'Unknown')}\n")
-                
-                self.update_progress("[4] 开始符号化...")
-                self.symbolicated_content = self.symbolizer.symbolize_metrickit(self.progress_callback)
-            
-            # 显示结果
-            if self.symbolicated_content:
-                self.result_text.setText(self.symbolicated_content)
-                self.export_btn.setEnabled(True)
-                self.update_progress("\n✓ 符号化过程完成")
-            
-        except Exception as e:
-            self.update_progress(f"\n错误: {str(e)}")
-            import traceback
-            self.update_progress(traceback.format_exc())
+        self.symbolizer.crashed_only = self.crashed_only_checkbox.isChecked()
+        self.symbolization_thread.set_paths(self.archive_path, self.crash_json_path, self.crash_radio.isChecked())
+        self.symbolization_thread.start()
+        
+    def show_result(self, content):
+        """显示符号化结果，过长的结果只显示开头部分，导出时仍写入完整内容"""
+        if content:
+            self.symbolicated_content = content
+            if len(content) > self.MAX_RESULT_PREVIEW_CHARS:
+                content = content[:self.MAX_RESULT_PREVIEW_CHARS] + "\n\n[... 结果过长，仅显示开头部分，请使用“导出解析结果”查看完整内容 ...]"
+            self.result_text.setPlainText(content)
+            self.export_btn.setEnabled(True)
+            self.update_progress("\n✓ 符号化过程完成")
+        self.flush_progress()
 
 def main():
     app = QApplication(sys.argv)
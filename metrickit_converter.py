@@ -5,11 +5,88 @@ import json
 import os
 import datetime
 import plistlib
+import functools
+import itertools
 from pathlib import Path
 
+# orjson可选，安装后用于加快MetricKit JSON的解析
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Crash文件中Date/Time字段的格式
+CRASH_DATE_FORMAT = "%Y-%m-%d %H:%M:%S.000 %z"
+
+
+@functools.lru_cache(maxsize=8)
+def _load_plist_cached(path, mtime, size):
+    """
+    读取并解析plist文件，同一文件未修改时直接返回上次的解析结果
+    
+    返回的对象在多次调用之间共享，调用方不应修改。
+    
+    Args:
+        path: plist文件路径
+        mtime: 文件的修改时间，作为缓存键的一部分
+        size: 文件大小，作为缓存键的一部分
+        
+    Returns:
+        dict: 解析后的plist内容
+    """
+    with open(path, 'rb') as fp:
+        return plistlib.load(fp)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path, mtime, size):
+    """
+    读取并解析JSON文件，同一文件未修改时直接返回上次的解析结果
+    
+    返回的对象在多次调用之间共享，调用方不应修改。
+    
+    Args:
+        path: JSON文件路径
+        mtime: 文件的修改时间，作为缓存键的一部分
+        size: 文件大小，作为缓存键的一部分
+        
+    Returns:
+        解析后的JSON数据
+    """
+    # 直接解析文件的原始字节，不先解码为完整的字符串
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _format_timestamp(timestamp):
+    """
+    将MetricKit中ISO格式的时间转换为Crash文件中的时间格式
+    
+    Python 3.11起fromisoformat直接支持结尾的Z，更早的版本先替换为+00:00再解析。
+    
+    Args:
+        timestamp: ISO格式的时间字符串
+        
+    Returns:
+        str: 转换后的时间，无法解析时原样返回
+    """
+    try:
+        try:
+            dt = datetime.datetime.fromisoformat(timestamp)
+        except ValueError:
+            dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        return dt.strftime(CRASH_DATE_FORMAT)
+    except (ValueError, TypeError, AttributeError):
+        return timestamp
+
+
 class MetricKitConverter:
     """MetricKit JSON格式转换器"""
     
+    __slots__ = ("app_info", "binary_images")
+    
     def __init__(self):
         self.app_info = {}
         self.binary_images = []
@@ -29,12 +106,15 @@ class MetricKitConverter:
         if not os.path.exists(products_path):
             raise FileNotFoundError(f"Applications目录不存在: {products_path}")
             
-        # 查找.app文件
-        app_files = [f for f in os.listdir(products_path) if f.endswith('.app')]
-        if not app_files:
+        # 查找.app文件，找到第一个即停止遍历
+        app_path = None
+        with os.scandir(products_path) as it:
+            for entry in it:
+                if entry.name.endswith('.app'):
+                    app_path = entry.path
+                    break
+        if app_path is None:
             raise FileNotFoundError("找不到.app文件")
-            
-        app_path = os.path.join(products_path, app_files[0])
         
         # 获取应用包中的Info.plist文件
         info_plist_path = os.path.join(app_path, "Info.plist")
@@ -43,17 +123,19 @@ class MetricKitConverter:
             
         # 解析Info.plist获取应用信息
         try:
-            with open(info_plist_path, 'rb') as fp:
-                info_plist = plistlib.load(fp)
-                self.app_info = {
-                    'name': info_plist.get("CFBundleExecutable", ""),
-                    'bundle_id': info_plist.get("CFBundleIdentifier", ""),
-                    'version': info_plist.get("CFBundleShortVersionString", ""),
-                    'build': info_plist.get("CFBundleVersion", "")
-                }
-                
+            stat = os.stat(info_plist_path)
+            info_plist = _load_plist_cached(info_plist_path, stat.st_mtime, stat.st_size)
+            self.app_info = {
+                'name': info_plist.get("CFBundleExecutable", ""),
+                'bundle_id': info_plist.get("CFBundleIdentifier", ""),
+                'version': info_plist.get("CFBundleShortVersionString", ""),
+                'build': info_plist.get("CFBundleVersion", "")
+            }
+            
+        except OSError as e:
+            raise OSError(f"解析Info.plist失败: {str(e)}") from e
         except Exception as e:
-            raise Exception(f"解析Info.plist失败: {str(e)}")
+            raise ValueError(f"解析Info.plist失败: {str(e)}") from e
             
     def convert_json_to_crash(self, json_path):
         """
@@ -66,9 +148,9 @@ class MetricKitConverter:
             str: 转换后的Crash内容
         """
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                crash_data = json.load(f)
-                
+            stat = os.stat(json_path)
+            crash_data = _load_json_cached(json_path, stat.st_mtime, stat.st_size)
+            
             # 验证JSON格式
             if not isinstance(crash_data, dict):
                 raise ValueError("无效的JSON格式")
@@ -78,64 +160,60 @@ class MetricKitConverter:
             if not payload:
                 raise ValueError("找不到crash信息")
                 
-            # 构建crash报告
-            crash_report = []
-            
-            # 添加头部信息
-            crash_report.append(f"Incident Identifier: {crash_data.get('diagnosticMetadata', {}).get('incidentId', 'Unknown')}")
-            crash_report.append(f"CrashReporter Key:   {crash_data.get('metaData', {}).get('deviceId', 'Unknown')}")
-            crash_report.append(f"Hardware Model:      {crash_data.get('metaData', {}).get('deviceType', 'Unknown')}")
+            meta_data = crash_data.get('metaData', {})
+            exception = payload.get('exception', {})
             
             # 处理时间
+            date_lines = ()
             timestamp = crash_data.get('timeStamp', '')
             if timestamp:
-                try:
-                    # 将ISO格式时间转换为所需格式
-                    dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S.000 %z")
-                    crash_report.append(f"Date/Time:           {formatted_time}")
-                except:
-                    crash_report.append(f"Date/Time:           {timestamp}")
+                date_lines = (f"Date/Time:           {_format_timestamp(timestamp)}",)
                     
-            # 添加应用信息
-            crash_report.append(f"Process:             {self.app_info['name']} [{payload.get('processId', 'Unknown')}]")
-            crash_report.append(f"Version:             {self.app_info['version']} ({self.app_info['build']})")
-            crash_report.append(f"Bundle Identifier:   {self.app_info['bundle_id']}")
-            crash_report.append(f"OS Version:          {crash_data.get('metaData', {}).get('osVersion', 'Unknown')}")
-            
-            # 添加异常信息
-            exception = payload.get('exception', {})
-            crash_report.append(f"Exception Type:      {exception.get('type', 'Unknown')}")
-            crash_report.append(f"Exception Codes:     {exception.get('code', 'Unknown')}")
-            crash_report.append(f"Exception Note:      {exception.get('signal', '')}")
+            # 头部信息，时间之后依次是应用信息、异常信息和触发线程信息
+            header_lines = (
+                f"Incident Identifier: {crash_data.get('diagnosticMetadata', {}).get('incidentId', 'Unknown')}",
+                f"CrashReporter Key:   {meta_data.get('deviceId', 'Unknown')}",
+                f"Hardware Model:      {meta_data.get('deviceType', 'Unknown')}",
+            )
+            info_lines = (
+                f"Process:             {self.app_info['name']} [{payload.get('processId', 'Unknown')}]",
+                f"Version:             {self.app_info['version']} ({self.app_info['build']})",
+                f"Bundle Identifier:   {self.app_info['bundle_id']}",
+                f"OS Version:          {meta_data.get('osVersion', 'Unknown')}",
+                f"Exception Type:      {exception.get('type', 'Unknown')}",
+                f"Exception Codes:     {exception.get('code', 'Unknown')}",
+                f"Exception Note:      {exception.get('signal', '')}",
+                f"Triggered by Thread: {payload.get('threadId', 0)}",
+            )
             
-            # 添加触发线程信息
-            crash_report.append(f"Triggered by Thread: {payload.get('threadId', 0)}")
+            # 线程回溯和二进制镜像信息，每行只格式化一次
+            frame_lines = (
+                f"{i: >3}  {frame.get('binaryName', 'Unknown')}  {frame.get('address', '0x0')}  "
+                f"+{frame.get('offsetIntoBinaryTextSegment', 0)}"
+                for i, frame in enumerate(payload.get('callStack', []))
+            )
+            image_lines = (
+                f"{image.get('baseAddress', '0x0')} - {image.get('endAddress', '0x0')}  "
+                f"{image.get('name', 'Unknown')}  {image.get('version', 'Unknown')}  <{image.get('uuid', 'Unknown')}>"
+                for image in payload.get('binaryImages', [])
+            )
             
-            # 添加线程回溯
-            crash_report.append("\nThread 0 Crashed:")
-            callstack = payload.get('callStack', [])
-            for i, frame in enumerate(callstack):
-                frame_str = f"{i: >3}  {frame.get('binaryName', 'Unknown')}  "
-                frame_str += f"{frame.get('address', '0x0')}  "
-                frame_str += f"+{frame.get('offsetIntoBinaryTextSegment', 0)}"
-                crash_report.append(frame_str)
-                
-            # 添加二进制镜像信息
-            crash_report.append("\nBinary Images:")
-            binary_images = payload.get('binaryImages', [])
-            for image in binary_images:
-                image_str = f"{image.get('baseAddress', '0x0')} - "
-                image_str += f"{image.get('endAddress', '0x0')}  "
-                image_str += f"{image.get('name', 'Unknown')}  "
-                image_str += f"{image.get('version', 'Unknown')}  "
-                image_str += f"<{image.get('uuid', 'Unknown')}>"
-                crash_report.append(image_str)
-                
-            return "\n".join(crash_report)
+            return "\n".join(itertools.chain(
+                header_lines,
+                date_lines,
+                info_lines,
+                ("\nThread 0 Crashed:",),
+                frame_lines,
+                ("\nBinary Images:",),
+                image_lines,
+            ))
             
         except json.JSONDecodeError as e:
-            raise ValueError(f"JSON解析失败: {str(e)}")
+            raise ValueError(f"JSON解析失败: {str(e)}") from e
+        except ValueError as e:
+            raise ValueError(f"转换失败: {str(e)}") from e
+        except OSError as e:
+            raise OSError(f"转换失败: {str(e)}") from e
         except Exception as e:
             raise Exception(f"转换失败: {str(e)}")
             
@@ -150,5 +228,5 @@ class MetricKitConverter:
         try:
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(crash_content)
-        except Exception as e:
-            raise Exception(f"保存文件失败: {str(e)}") 
\ No newline at end of file
+        except OSError as e:
+            raise OSError(f"保存文件失败: {str(e)}") from e 
\ No newline at end of file
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""符号化流程，图形界面和命令行工具共用同一套步骤和进度信息"""
+
+
+def _begin_step(progress, message):
+    """报告一个步骤开始，进度回调有缓冲时立即发送，耗时的步骤执行期间界面不会停在上一条信息"""
+    progress.emit(message)
+    flush = getattr(progress, "flush", None)
+    if flush is not None:
+        flush()
+
+
+def _load_archive(symbolizer, archive_path, progress):
+    """加载Archive文件并报告应用信息"""
+    _begin_step(progress, "[1] 加载Archive文件...")
+    symbolizer.load_archive(archive_path)
+    progress.emit("✓ Archive加载成功")
+    progress.emit(f"  - 应用名称: {symbolizer.binary_name}")
+    progress.emit(f"  - dSYM路径: {symbolizer.dsym_path}")
+    progress.emit(f"  - UUID: {symbolizer.binary_uuid}\n")
+
+
+def run_crash_pipeline(symbolizer, archive_path, crash_path, progress):
+    """
+    符号化Crash文件
+
+    Args:
+        symbolizer: CrashSymbolizer实例
+        archive_path: .xcarchive文件的路径
+        crash_path: Crash文件的路径
+        progress: 进度回调，需要提供emit(message)方法
+
+    Returns:
+        str: 符号化后的内容
+    """
+    _load_archive(symbolizer, archive_path, progress)
+
+    _begin_step(progress, "[2] 加载Crash文件...")
+    crash_content = symbolizer.load_crash_file(crash_path)
+    progress.emit("✓ Crash文件加载成功")
+    progress.emit(f"  - 文件大小: {len(crash_content)} 字节\n")
+
+    _begin_step(progress, "[3] 解析Crash信息...")
+    symbolizer.parse_crash(crash_content)
+    progress.emit("✓ 解析完成\n")
+
+    _begin_step(progress, "[4] 开始符号化...")
+    return symbolizer.symbolize(progress)
+
+
+def run_metrickit_pipeline(symbolizer, archive_path, json_path, progress):
+    """
+    符号化MetricKit JSON文件
+
+    Args:
+        symbolizer: CrashSymbolizer实例
+        archive_path: .xcarchive文件的路径
+        json_path: MetricKit JSON文件的路径
+        progress: 进度回调，需要提供emit(message)方法
+
+    Returns:
+        str: 符号化后的内容
+    """
+    _load_archive(symbolizer, archive_path, progress)
+
+    _begin_step(progress, "[2] 加载MetricKit JSON文件...")
+    json_data = symbolizer.load_metrickit_json(json_path)
+    progress.emit("✓ JSON文件加载成功")
+    progress.emit(f"  - 文件大小: {symbolizer.metrickit_json_size} 字节\n")
+
+    _begin_step(progress, "[3] 解析崩溃信息...")
+    symbolizer.parse_metrickit_crash(json_data)
+    progress.emit("✓ 解析完成")
+    progress.emit(f"  - 设备型号: {symbolizer.device_info.get('model', 'Unknown')}")
+    progress.emit(f"  - 系统版本: {symbolizer.device_info.get('os_version', 'Unknown')}")
+    progress.emit(f"  - 应用名称: {symbolizer.process_info.get('name', 'Unknown')}")
+    progress.emit(f"  - 应用版本: {symbolizer.process_info.get('version', 'Unknown')}")
+    progress.emit(f"  - 崩溃原因: {symbolizer.crash_reason}")
+    progress.emit(f"  - 二进制镜像数: {len(symbolizer.binary_images)}")
+    progress.emit(f"  - 线程数: {len(symbolizer.crash_threads)}\n")
+
+    _begin_step(progress, "[4] 开始符号化...")
+    return symbolizer.symbolize_metrickit(progress)
@@ -4,7 +4,8 @@ APP = ['main.py']
 DATA_FILES = []
 OPTIONS = {
     'argv_emulation': True,
-    'packages': ['PyQt6', 'pkg_resources', 'jaraco.text'],
+    'packages': ['PyQt6'],
+    'optimize': 2,  # 打包为 -OO 字节码, 去掉断言和文档字符串
     'iconfile': 'app.icns',
     'plist': {
         'CFBundleName': 'iOS崩溃日志符号化工具',
@@ -14,7 +15,8 @@ OPTIONS = {
         'CFBundleShortVersionString': '1.0.0',
         'NSHumanReadableCopyright': '© 2024'
     },
-    'excludes': ['packaging']  # 排除可能导致冲突的包
+    # 排除可能导致冲突的包; 应用本身不依赖 pkg_resources, 打进去会在启动时扫描 entry_points
+    'excludes': ['packaging', 'pkg_resources', 'setuptools', 'jaraco', 'pip']
 }
 
 setup(
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+
+import os
+import plistlib
+import tempfile
+import unittest
+from unittest import mock
+
+import crash_symbolizer
+from crash_symbolizer import CrashSymbolizer
+
+
+class SymbolCacheTest(unittest.TestCase):
+    """有上限的符号缓存"""
+
+    def test_evicts_oldest_entries_past_the_limit(self):
+        cache = crash_symbolizer._SymbolCache(2)
+        cache["0x1"] = "a"
+        cache.setdefault("0x2", "b")
+        cache.update({"0x3": "c", "0x4": "d"})
+
+        self.assertEqual(dict(cache), {"0x3": "c", "0x4": "d"})
+
+    def test_recently_used_entry_survives_eviction(self):
+        cache = crash_symbolizer._SymbolCache(2)
+        cache["0x1"] = "a"
+        cache["0x2"] = "b"
+        self.assertEqual(cache["0x1"], "a")
+        cache["0x3"] = "c"
+        self.assertEqual(cache.get("0x1"), "a")
+        cache["0x4"] = "d"
+
+        self.assertEqual(dict(cache), {"0x1": "a", "0x4": "d"})
+
+    def test_symbolizer_uses_bounded_cache(self):
+        symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(symbolizer.close)
+
+        self.assertEqual(symbolizer.symbol_cache.maxsize, crash_symbolizer.SYMBOL_CACHE_MAX_ENTRIES)
+
+
+LLDB_BATCH_OUTPUT = b"""\
+(lldb) target create --arch arm64 "/tmp/MyApp.app/MyApp"
+Current executable set to '/tmp/MyApp.app/MyApp' (arm64).
+(lldb) target symbols add "/tmp/MyApp.app.dSYM"
+(lldb) target modules load --file "MyApp" __TEXT 0x104000000
+(lldb) image lookup --address 0x104001234
+      Address: MyApp[0x0000000100001234] (MyApp.__TEXT.__text + 4660)
+      Summary: MyApp`main + 20 at main.swift:12
+(lldb) image lookup --address 0x104009999
+"""
+
+
+class LldbBatchLookupTest(unittest.TestCase):
+    """atos未能解析时的lldb命令行查询"""
+
+    def test_queries_all_addresses_of_an_image_in_one_process(self):
+        result = mock.Mock(stdout=LLDB_BATCH_OUTPUT)
+        with mock.patch.object(crash_symbolizer.subprocess, "run", return_value=result) as run:
+            summaries = crash_symbolizer._lldb_batch_lookup(
+                "arm64", "/tmp/MyApp.app/MyApp", "/tmp/MyApp.app.dSYM", "0x104000000",
+                ["0x104001234", "0x104009999"]
+            )
+
+        run.assert_called_once()
+        command = run.call_args[0][0]
+        self.assertIn('target create --arch arm64 "/tmp/MyApp.app/MyApp"', command)
+        self.assertIn('target modules load --file "MyApp" __TEXT 0x104000000', command)
+        self.assertIn("image lookup --address 0x104001234", command)
+        self.assertIn("image lookup --address 0x104009999", command)
+        self.assertEqual(summaries, ["MyApp`main + 20 at main.swift:12", None])
+
+
+class LldbBatchTest(unittest.TestCase):
+    """进程内lldb查询"""
+
+    def setUp(self):
+        self.symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(self.symbolizer.close)
+
+    def test_resolves_addresses_as_file_addresses(self):
+        lldb = mock.MagicMock()
+        target = mock.MagicMock()
+        module = mock.MagicMock()
+        module.GetObjectFileHeaderAddress.return_value.GetFileAddress.return_value = 0x100000000
+        module.GetFileSpec.return_value.GetFilename.return_value = "MyApp"
+        context = target.ResolveFileAddress.return_value.GetSymbolContext.return_value
+        context.GetFunction.return_value.GetName.return_value = "main"
+        context.GetLineEntry.return_value.IsValid.return_value = True
+        context.GetLineEntry.return_value.GetFileSpec.return_value.GetFilename.return_value = "main.swift"
+        context.GetLineEntry.return_value.GetLine.return_value = 12
+        self.symbolizer.binary_path = "/tmp/MyApp.app/MyApp"
+        self.symbolizer.dsym_path = "/tmp/MyApp.app.dSYM"
+        self.symbolizer._lldb_targets[("/tmp/MyApp.app/MyApp", "/tmp/MyApp.app.dSYM", "arm64")] = (target, module)
+
+        with mock.patch.object(crash_symbolizer, "lldb", lldb):
+            symbols = self.symbolizer._lldb_batch("arm64", "0x104000000", ["0x104001234"])
+
+        target.ResolveFileAddress.assert_called_once_with(0x100001234)
+        lldb.SBAddress.assert_not_called()
+        self.assertEqual(symbols, ["main (in MyApp) (main.swift:12)"])
+
+    def test_targets_are_not_shared_between_archives(self):
+        lldb = mock.MagicMock()
+        debugger = lldb.SBDebugger.Create.return_value
+        debugger.CreateTargetWithFileAndArch.return_value.GetNumModules.return_value = 1
+
+        with mock.patch.object(crash_symbolizer, "lldb", lldb):
+            self.symbolizer.binary_path, self.symbolizer.dsym_path = "/tmp/A.app/A", "/tmp/A.app.dSYM"
+            self.symbolizer._lldb_target("arm64")
+            self.symbolizer.binary_path, self.symbolizer.dsym_path = "/tmp/B.app/B", "/tmp/B.app.dSYM"
+            self.symbolizer._lldb_target("arm64")
+            self.symbolizer.close()
+
+        self.assertEqual(
+            [c.args for c in debugger.CreateTargetWithFileAndArch.call_args_list],
+            [("/tmp/A.app/A", "arm64"), ("/tmp/B.app/B", "arm64")]
+        )
+
+
+CRASH_WITH_EXCEPTION_BACKTRACE = b"""\
+Process:             MyApp [1234]
+Triggered by Thread:  0
+
+Last Exception Backtrace:
+0   CoreFoundation                	0x00000001abcdef12 __exceptionPreprocess + 176
+1   MyApp                         	0x0000000100001234 MyApp + 4660
+
+Thread 0 Crashed:
+0   libsystem_kernel.dylib        	0x00000001abcdf254 __pthread_kill + 8
+1   MyApp                         	0x0000000100002345 MyApp + 9029
+
+Thread 1:
+0   MyApp                         	0x0000000100003456 MyApp + 13398
+
+Binary Images:
+0x100000000 - 0x100007fff MyApp arm64  <abcdef1234567890abcdef1234567890> /var/containers/MyApp.app/MyApp
+"""
+
+
+class CrashedOnlyTest(unittest.TestCase):
+    """只符号化崩溃线程"""
+
+    def setUp(self):
+        self.symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(self.symbolizer.close)
+        self.symbolizer.binary_name = "MyApp"
+        self.symbolizer.dsym_arch = "arm64"
+        self.symbolizer.crashed_only = True
+        self.symbolizer.parse_crash(CRASH_WITH_EXCEPTION_BACKTRACE)
+
+    def _symbolize(self):
+        def resolve(arch, load_address, addresses, use_lldb):
+            return {address: f"sym_{address}" for address in addresses}, [], []
+
+        with mock.patch.object(self.symbolizer, "_resolve_with_arch", side_effect=resolve), \
+                mock.patch.object(self.symbolizer, "_load_cached_symbols", return_value={}), \
+                mock.patch.object(self.symbolizer, "_save_cached_symbols"):
+            return self.symbolizer.symbolize(use_lldb=False)
+
+    def test_keeps_last_exception_backtrace_frames(self):
+        output = self._symbolize()
+
+        self.assertIn("sym_0x0000000100001234", output)
+        self.assertIn("sym_0x0000000100002345", output)
+        self.assertNotIn("sym_0x0000000100003456", output)
+        self.assertIn("0x0000000100003456 MyApp + 13398", output)
+
+
+class UnresolvedAddressTest(unittest.TestCase):
+    """只记录工具明确无法解析的地址"""
+
+    def setUp(self):
+        self.symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(self.symbolizer.close)
+        self.symbolizer.binary_name = "MyApp"
+        self.symbolizer.dsym_arch = "arm64"
+        self.symbolizer.parse_crash(CRASH_WITH_EXCEPTION_BACKTRACE)
+
+    def _symbolize(self, **atos):
+        with mock.patch.object(self.symbolizer, "_atos_batch", **atos) as atos_batch, \
+                mock.patch.object(self.symbolizer, "_start_atos"), \
+                mock.patch.object(self.symbolizer, "_load_cached_symbols", return_value={}), \
+                mock.patch.object(self.symbolizer, "_save_cached_symbols"):
+            self.symbolizer.symbolize(use_lldb=False)
+        return atos_batch
+
+    def test_failed_lookup_is_retried(self):
+        self._symbolize(side_effect=TimeoutError("atos timed out"))
+        self.assertEqual(self.symbolizer._unresolved, set())
+
+        atos_batch = self._symbolize(side_effect=lambda arch, path, load, addrs: [None] * len(addrs))
+        self.assertTrue(atos_batch.called)
+
+    def test_unresolved_answer_is_recorded_per_image(self):
+        self._symbolize(side_effect=lambda arch, path, load, addrs: [None] * len(addrs))
+        self.assertIn(
+            ("abcdef1234567890abcdef1234567890", 0x3456),
+            self.symbolizer._unresolved
+        )
+
+        atos_batch = self._symbolize(side_effect=AssertionError("should not be queried"))
+        self.assertFalse(atos_batch.called)
+
+
+class CrashSymbolCacheTest(unittest.TestCase):
+    """Crash文件的符号缓存按镜像UUID和偏移保存"""
+
+    def setUp(self):
+        self.symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(self.symbolizer.close)
+        self.symbolizer.binary_name = "MyApp"
+        self.symbolizer.dsym_arch = "arm64"
+
+    def _symbolize(self, crash_content, **atos):
+        self.symbolizer.parse_crash(crash_content)
+        with mock.patch.object(self.symbolizer, "_atos_batch", **atos), \
+                mock.patch.object(self.symbolizer, "_start_atos"), \
+                mock.patch.object(self.symbolizer, "_load_cached_symbols", return_value={}), \
+                mock.patch.object(self.symbolizer, "_save_cached_symbols"):
+            return self.symbolizer.symbolize(use_lldb=False)
+
+    def test_symbols_are_reused_across_load_addresses(self):
+        self._symbolize(
+            CRASH_WITH_EXCEPTION_BACKTRACE,
+            side_effect=lambda arch, path, load, addrs: [f"sym_{int(a, 16) - int(load, 16):x}" for a in addrs]
+        )
+        slid = CRASH_WITH_EXCEPTION_BACKTRACE.replace(b"0x00000001000", b"0x00000001040").replace(
+            b"0x100000000 - 0x100007fff", b"0x104000000 - 0x104007fff"
+        )
+        output = self._symbolize(slid, side_effect=AssertionError("should not be queried"))
+
+        self.assertIn("0x0000000104001234 sym_1234", output)
+        self.assertIn("0x0000000104003456 sym_3456", output)
+
+
+class MetricKitLldbFallbackTest(unittest.TestCase):
+    """MetricKit中atos未能解析的地址交给lldb"""
+
+    def setUp(self):
+        self.symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(self.symbolizer.close)
+        self.symbolizer.binary_name = "MyApp"
+        self.symbolizer.binary_uuid = "abcdef1234567890abcdef1234567890"
+        self.symbolizer._metrickit_images = {
+            "MyApp": {
+                "name": "MyApp", "uuid": "ABCDEF12-3456-7890-ABCD-EF1234567890",
+                "arch": "arm64", "base": 0x104000000, "base_hex": "0x104000000"
+            }
+        }
+
+    def _pre_resolve(self, address, **lldb):
+        self.symbolizer.crash_threads = [{"crashed": True, "frames": [{"binary": "MyApp", "address": address}]}]
+        with mock.patch.object(self.symbolizer, "_lldb_lookup_image", **lldb) as lookup, \
+                mock.patch.object(self.symbolizer, "_atos_image_batch", return_value=[]), \
+                mock.patch.object(self.symbolizer, "_load_cached_symbols", return_value={}), \
+                mock.patch.object(self.symbolizer, "_save_cached_symbols"):
+            self.symbolizer._pre_resolve_all_frames()
+        return lookup
+
+    def test_failed_lldb_is_not_disabled(self):
+        self._pre_resolve("0x104001234", return_value=None)
+        self.assertEqual(self.symbolizer._lldb_failed_dsyms, set())
+
+        lookup = self._pre_resolve("0x104001234", return_value=[None])
+        lookup.assert_called_once()
+
+    def test_lldb_is_disabled_per_dsym(self):
+        self._pre_resolve("0x104001234", return_value=[None])
+        self.assertEqual(self.symbolizer._lldb_failed_dsyms, {"abcdef1234567890abcdef1234567890"})
+        lookup = self._pre_resolve("0x104005678", return_value=[None])
+        lookup.assert_not_called()
+
+        self.symbolizer.binary_uuid = "00112233445566778899aabbccddeeff"
+        lookup = self._pre_resolve("0x104005678", return_value=[None])
+        lookup.assert_called_once()
+
+
+class LoadArchiveCacheTest(unittest.TestCase):
+    """同一个Archive未修改时不重复加载"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive = os.path.join(tmp.name, "MyApp.xcarchive")
+        app = os.path.join(self.archive, "Products", "Applications", "MyApp.app")
+        os.makedirs(app)
+        with open(os.path.join(app, "Info.plist"), "wb") as f:
+            plistlib.dump({"CFBundleExecutable": "MyApp"}, f)
+        with open(os.path.join(app, "MyApp"), "wb") as f:
+            f.write(b"binary")
+        self.dsym = os.path.join(self.archive, "dSYMs", "MyApp.app.dSYM")
+        self.dwarf = os.path.join(self.dsym, "Contents", "Resources", "DWARF", "MyApp")
+        os.makedirs(os.path.dirname(self.dwarf))
+        with open(self.dwarf, "wb") as f:
+            f.write(b"dwarf")
+
+        self.symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(self.symbolizer.close)
+
+        uuid = "UUID: ABCDEF12-3456-7890-ABCD-EF1234567890 (arm64) path"
+        patcher = mock.patch.object(crash_symbolizer, "_dwarfdump_uuid", return_value=uuid)
+        self.dwarfdump = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(self.symbolizer, "_start_atos")
+        self.start_atos = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_atos_is_prestarted_only_without_lldb(self):
+        with mock.patch.object(crash_symbolizer, "lldb", mock.MagicMock()):
+            self.symbolizer.load_archive(self.archive)
+        self.start_atos.assert_not_called()
+
+        self.symbolizer._loaded_archive_key = None
+        with mock.patch.object(crash_symbolizer, "lldb", None):
+            self.symbolizer.load_archive(self.archive)
+        self.start_atos.assert_called_once_with("arm64", self.dsym)
+
+    def test_unchanged_archive_is_not_reloaded(self):
+        self.symbolizer.load_archive(self.archive)
+        calls = self.dwarfdump.call_count
+        self.symbolizer.load_archive(self.archive)
+
+        self.assertEqual(self.dwarfdump.call_count, calls)
+
+    def test_rebuilt_dsym_reloads_archive(self):
+        self.symbolizer.load_archive(self.archive)
+        calls = self.dwarfdump.call_count
+        atos = mock.Mock()
+        self.symbolizer._atos_pool[("arm64", self.dsym)] = mock.Mock(**{"result.return_value": atos})
+        self.symbolizer._unresolved.add(("abcdef1234567890abcdef1234567890", 0x1234))
+        self.symbolizer._lldb_failed_dsyms.add(self.symbolizer.binary_uuid)
+
+        # 原地改写DWARF文件不会改变Archive目录和dSYM目录本身的修改时间
+        dsym_mtime = os.stat(self.dsym).st_mtime_ns
+        with open(self.dwarf, "wb") as f:
+            f.write(b"rebuilt dwarf")
+        self.symbolizer.load_archive(self.archive)
+
+        self.assertEqual(os.stat(self.dsym).st_mtime_ns, dsym_mtime)
+        self.assertGreater(self.dwarfdump.call_count, calls)
+        atos.close.assert_called_once()
+        self.assertNotIn(("arm64", self.dsym), self.symbolizer._atos_pool)
+        self.assertEqual(self.symbolizer._unresolved, set())
+        self.assertEqual(self.symbolizer._lldb_failed_dsyms, set())
+
+
+class DwarfdumpCacheTest(unittest.TestCase):
+    """dwarfdump的结果按DWARF文件缓存"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dsym = os.path.join(tmp.name, "MyApp.app.dSYM")
+        self.dwarf = os.path.join(self.dsym, "Contents", "Resources", "DWARF", "MyApp")
+        os.makedirs(os.path.dirname(self.dwarf))
+        with open(self.dwarf, "wb") as f:
+            f.write(b"old")
+        crash_symbolizer._dwarfdump_uuid.cache_clear()
+        self.addCleanup(crash_symbolizer._dwarfdump_uuid.cache_clear)
+
+    def _dwarfdump(self):
+        return crash_symbolizer._dwarfdump_uuid(self.dsym, crash_symbolizer._file_signature(self.dsym))
+
+    def test_rewritten_dwarf_file_invalidates_cached_uuid(self):
+        result = mock.Mock(stdout=b"UUID: ABCD (arm64) path")
+        with mock.patch.object(crash_symbolizer.subprocess, "run", return_value=result) as run:
+            self._dwarfdump()
+            self._dwarfdump()
+            self.assertEqual(run.call_count, 1)
+
+            # 只改写DWARF文件，dSYM目录的修改时间不变
+            dsym_mtime = os.stat(self.dsym).st_mtime_ns
+            with open(self.dwarf, "wb") as f:
+                f.write(b"rebuilt")
+            self._dwarfdump()
+
+        self.assertEqual(os.stat(self.dsym).st_mtime_ns, dsym_mtime)
+        self.assertEqual(run.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
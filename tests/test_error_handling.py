@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import test_symbolizer
+from crash_symbolizer import CrashSymbolizer
+from metrickit_converter import MetricKitConverter
+
+
+class LoaderErrorTest(unittest.TestCase):
+    """文件读取和数据格式错误以OSError/ValueError抛出，界面和命令行不为其打印调用栈"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bad_json = os.path.join(self.tmp.name, "crash.json")
+        with open(self.bad_json, "w", encoding="utf-8") as f:
+            f.write("{not json")
+
+    def test_malformed_metrickit_json_raises_value_error(self):
+        symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(symbolizer.close)
+        with self.assertRaises(ValueError):
+            symbolizer.load_metrickit_json(self.bad_json)
+
+    def test_unexpected_metrickit_structure_raises_value_error(self):
+        symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(symbolizer.close)
+        with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(ValueError):
+            symbolizer.parse_metrickit_crash([])
+
+    def test_unreadable_crash_file_raises_os_error(self):
+        symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(symbolizer.close)
+        with self.assertRaises(OSError):
+            symbolizer.load_crash_file(self.tmp.name)
+
+    def test_converter_malformed_json_raises_value_error(self):
+        converter = MetricKitConverter()
+        converter.app_info = {'name': '', 'bundle_id': '', 'version': '', 'build': ''}
+        with self.assertRaises(ValueError):
+            converter.convert_json_to_crash(self.bad_json)
+
+    def test_cli_reports_malformed_json_without_traceback(self):
+        os.mkdir(os.path.join(self.tmp.name, "Stellar.xcarchive"))
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+
+        output = io.StringIO()
+        with mock.patch.object(CrashSymbolizer, "load_archive"), \
+                contextlib.redirect_stdout(output), self.assertRaises(SystemExit):
+            test_symbolizer.main()
+
+        self.assertIn("错误: JSON格式错误", output.getvalue())
+        self.assertNotIn("Traceback", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest import mock
+
+from crash_symbolizer import CrashSymbolizer
+from pipeline import run_metrickit_pipeline
+
+
+class BufferedProgress:
+    """与界面的ProgressCallback一样先缓冲，flush时才发送"""
+
+    def __init__(self):
+        self.buffered = []
+        self.sent = []
+
+    def emit(self, message):
+        self.buffered.append(message)
+
+    def flush(self):
+        self.sent.extend(self.buffered)
+        self.buffered.clear()
+
+
+class PipelineProgressTest(unittest.TestCase):
+    """各步骤开始时缓冲的进度信息立即发送"""
+
+    def test_step_message_is_flushed_before_the_step_runs(self):
+        progress = BufferedProgress()
+        symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(symbolizer.close)
+
+        def load_archive(path):
+            self.assertIn("[1] 加载Archive文件...", progress.sent)
+            raise FileNotFoundError(path)
+
+        with mock.patch.object(symbolizer, "load_archive", side_effect=load_archive), \
+                self.assertRaises(FileNotFoundError):
+            run_metrickit_pipeline(symbolizer, "App.xcarchive", "crash.json", progress)
+
+    def test_symbolizer_flush_also_flushes_the_callback(self):
+        progress = BufferedProgress()
+        symbolizer = CrashSymbolizer(verbose=False)
+        self.addCleanup(symbolizer.close)
+
+        symbolizer._progress(progress, "[4] 开始符号化堆栈...")
+        symbolizer._flush_progress(progress)
+
+        self.assertEqual(progress.sent, ["[4] 开始符号化堆栈..."])
+
+
+if __name__ == "__main__":
+    unittest.main()